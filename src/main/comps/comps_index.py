@@ -0,0 +1,190 @@
+import logging
+import time
+import numpy as np
+from scipy.spatial import cKDTree
+from main.maintenance.model_data import get_model_data_table
+
+# Features compared per position. Each is standardized (z-score over the position's players)
+# so no single unit (weight in lbs vs. market share as a fraction) dominates the distance.
+COMP_FEATURES = {
+    "RB": ["production_score", "size_score", "draft_cap", "cupps_score",
+           "peak_rec_team_yards_market_share_adj", "avg_tprr", "weight"],
+    "WR": ["production_score", "size_score", "draft_cap", "cupps_score",
+           "peak_rec_team_yards_market_share_adj", "avg_tprr", "avg_yprr", "weight"],
+    "TE": ["production_score", "size_score", "draft_cap", "cupps_score",
+           "peak_rec_team_yards_market_share_adj", "avg_tprr", "avg_yprr", "weight"],
+}
+
+# Returned alongside each comp
+INFO_COLUMNS = ["player_id", "name", "draft_year", "avg_fppg_nfl"]
+
+def load_position_data(db_util, position):
+    """
+    Loads the comp features of every player of a position with all features present.
+    :return: (info rows as dicts, float64 feature matrix)
+    """
+    features = COMP_FEATURES[position]
+    not_null = " AND ".join(f"{feature} IS NOT NULL" for feature in features)
+    db_util.cursor.execute(f"""
+        SELECT {', '.join(INFO_COLUMNS + features)}
+        FROM {get_model_data_table(position)}
+        WHERE {not_null}
+        ORDER BY player_id
+    """)
+    rows = db_util.cursor.fetchall()
+
+    info = [dict(zip(INFO_COLUMNS, row[:len(INFO_COLUMNS)])) for row in rows]
+    matrix = np.array([row[len(INFO_COLUMNS):] for row in rows], dtype=np.float64).reshape(len(rows), len(features))
+    return info, matrix
+
+def blocked_nearest(queries, candidates, k, block_size=1024):
+    """
+    Exact k nearest candidates of every query row by Euclidean distance, computed as
+    |q|^2 + |c|^2 - 2 q.c one block of queries at a time, so memory stays at block_size x candidates.
+    :return: (distances, candidate indices), both shaped (queries, k) and sorted closest first.
+    """
+    k = min(k, len(candidates))
+    distances = np.empty((len(queries), k))
+    indices = np.empty((len(queries), k), dtype=np.int64)
+    if k == 0:
+        return distances, indices
+
+    candidate_norms = np.einsum("ij,ij->i", candidates, candidates)
+    for start in range(0, len(queries), block_size):
+        block = queries[start:start + block_size]
+        squared = np.einsum("ij,ij->i", block, block)[:, None] + candidate_norms[None, :] - 2.0 * (block @ candidates.T)
+        np.maximum(squared, 0.0, out=squared)  # rounding can leave tiny negatives
+
+        nearest = np.argpartition(squared, k - 1, axis=1)[:, :k] if k < len(candidates) else \
+            np.broadcast_to(np.arange(len(candidates)), squared.shape)
+        nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+        order = np.argsort(nearest_squared, axis=1, kind="stable")
+        indices[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:start + len(block)] = np.sqrt(np.take_along_axis(nearest_squared, order, axis=1))
+    return distances, indices
+
+class PositionComps:
+    """ Standardized feature matrix and KD-tree of one position's players. """
+
+    def __init__(self, position, info, matrix):
+        self.position = position
+        self.features = COMP_FEATURES[position]
+        self.info = info
+        self.player_ids = np.array([row["player_id"] for row in info], dtype=np.int64)
+        self.rows_by_player_id = {player_id: i for i, player_id in enumerate(self.player_ids.tolist())}
+
+        self.means = matrix.mean(axis=0) if len(matrix) else np.zeros(len(self.features))
+        stds = matrix.std(axis=0) if len(matrix) else np.ones(len(self.features))
+        self.stds = np.where(stds > 0, stds, 1.0)  # a constant feature contributes nothing
+        self.matrix = self.standardize(matrix)
+        self.tree = cKDTree(self.matrix) if len(self.matrix) else None
+
+    def standardize(self, matrix):
+        return (matrix - self.means) / self.stds
+
+    def __contains__(self, player_id):
+        return player_id in self.rows_by_player_id
+
+    def query(self, player_ids, k=20):
+        """
+        Finds the k nearest players to each of the given players (the player itself excluded).
+        :return: Dict player_id -> list of (comp info dict, distance), closest first.
+        """
+        rows = [self.rows_by_player_id[player_id] for player_id in player_ids]
+        if not rows or self.tree is None:
+            return {}
+
+        # One extra neighbour because every player is its own nearest neighbour
+        k_query = min(k + 1, len(self.matrix))
+        distances, neighbours = self.tree.query(self.matrix[rows], k=k_query)
+        distances = distances.reshape(len(rows), k_query)
+        neighbours = neighbours.reshape(len(rows), k_query)
+
+        comps = {}
+        for row, row_distances, row_neighbours in zip(rows, distances, neighbours):
+            comps[int(self.player_ids[row])] = [
+                (self.info[neighbour], float(distance))
+                for neighbour, distance in zip(row_neighbours, row_distances) if neighbour != row
+            ][:k]
+        return comps
+
+    def draft_class_comps(self, draft_year, k=20, block_size=1024):
+        """
+        Top-k comps for every player of a draft class among players drafted before it,
+        in one blocked pass over the distance matrix.
+        :return: Dict player_id -> list of (comp info dict, distance), closest first.
+        """
+        draft_years = np.array([np.nan if row["draft_year"] is None else row["draft_year"] for row in self.info],
+                               dtype=np.float64)
+        class_rows = np.flatnonzero(draft_years == draft_year)
+        history_rows = np.flatnonzero(draft_years < draft_year)
+
+        distances, neighbours = blocked_nearest(self.matrix[class_rows], self.matrix[history_rows], k, block_size)
+        return {
+            int(self.player_ids[row]): [(self.info[history_rows[neighbour]], float(distance))
+                                        for neighbour, distance in zip(row_neighbours, row_distances)]
+            for row, row_distances, row_neighbours in zip(class_rows, distances, neighbours)
+        }
+
+class CompsService:
+    """
+    Comps for RB, WR and TE from the materialized model data tables. The data is loaded once,
+    after which every query is answered from memory.
+    """
+
+    def __init__(self, db_util, positions=None):
+        self.indexes = {}
+        for position in positions or COMP_FEATURES:
+            start_time = time.perf_counter()
+            info, matrix = load_position_data(db_util, position)
+            self.indexes[position] = PositionComps(position, info, matrix)
+            logging.info(f"✅ Indexed {len(info)} {position}s for comps in {time.perf_counter() - start_time:.2f}s")
+
+    def get_position(self, player_id):
+        for position, index in self.indexes.items():
+            if player_id in index:
+                return position
+        return None
+
+    def get_info(self, player_id):
+        """ :return: The player's info dict (name, draft_year, ...), or None if not indexed. """
+        position = self.get_position(player_id)
+        if position is None:
+            return None
+        index = self.indexes[position]
+        return index.info[index.rows_by_player_id[player_id]]
+
+    def comps_for_players(self, player_ids, k=20):
+        """
+        Top-k comps for any number of players, batched into one tree query per position.
+        Players without all comp features are skipped with a warning.
+        :return: Dict player_id -> list of (comp info dict, distance), closest first.
+        """
+        by_position = {}
+        for player_id in player_ids:
+            position = self.get_position(player_id)
+            if position is None:
+                logging.warning(f"⚠️ Player {player_id} is not in the model data or is missing comp features, skipping.")
+                continue
+            by_position.setdefault(position, []).append(player_id)
+
+        comps = {}
+        for position, position_player_ids in by_position.items():
+            comps.update(self.indexes[position].query(position_player_ids, k))
+        return comps
+
+    def comps_for_player(self, player_id, k=20):
+        return self.comps_for_players([player_id], k).get(player_id, [])
+
+    def comps_for_draft_class(self, draft_year, k=20):
+        """ Top-k comps for every indexed player of a draft class. """
+        player_ids = [row["player_id"] for index in self.indexes.values()
+                      for row in index.info if row["draft_year"] == draft_year]
+        return self.comps_for_players(player_ids, k)
+
+    def historical_comps_for_draft_class(self, draft_year, k=20, block_size=1024):
+        """
+        Comps of a draft class against the players drafted before it, for every loaded position.
+        :return: Dict position -> {player_id: list of (comp info dict, distance)}.
+        """
+        return {position: index.draft_class_comps(draft_year, k, block_size) for position, index in self.indexes.items()}
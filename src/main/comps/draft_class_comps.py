@@ -0,0 +1,63 @@
+import argparse
+import csv
+import logging
+import time
+import sys
+import os
+
+# Add "src" to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from main.util.db_util import DatabaseUtility
+from main.maintenance.model_data import refresh_model_data
+from main.comps.comps_index import CompsService
+
+COMPS_REPORT_FIELDS = ["draft_year", "position", "player_id", "name", "rank", "comp_player_id", "comp_name",
+                       "comp_draft_year", "comp_avg_fppg_nfl", "distance"]
+
+REPORTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "reports"))
+
+def get_report_path(draft_year):
+    return os.path.join(REPORTS_DIR, f"draft_class_comps_{draft_year}.csv")
+
+def write_comps_report(service, draft_year, comps_by_position, report_path):
+    """ Writes one row per (prospect, comp) pair, closest comps first. """
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+
+    rows = 0
+    with open(report_path, mode="w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(COMPS_REPORT_FIELDS)
+        for position, comps in comps_by_position.items():
+            for player_id, player_comps in comps.items():
+                name = service.get_info(player_id)["name"]
+                for rank, (comp, distance) in enumerate(player_comps, start=1):
+                    writer.writerow([draft_year, position, player_id, name, rank, comp["player_id"], comp["name"],
+                                     comp["draft_year"], comp["avg_fppg_nfl"], round(distance, 4)])
+                    rows += 1
+
+    logging.info(f"📝 Wrote {rows} comps to {report_path}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Write the comps of a whole draft class to a CSV report.")
+    parser.add_argument("draft_year", type=int, help="Draft class to find comps for")
+    parser.add_argument("positions", nargs="*", type=str.upper, help="Positions to include (default: RB WR TE)")
+    parser.add_argument("-k", type=int, default=20, help="Comps per player (default: 20)")
+    parser.add_argument("--block-size", type=int, default=1024,
+                        help="Prospects per distance block, bounds memory to block size x historical players (default: 1024)")
+    parser.add_argument("--report", help="CSV file to write (default: comps/reports/draft_class_comps_<year>.csv)")
+    args = parser.parse_args()
+
+    with DatabaseUtility() as db_util:
+        refresh_model_data(db_util)
+        service = CompsService(db_util, args.positions or None)
+
+    start_time = time.perf_counter()
+    comps_by_position = service.historical_comps_for_draft_class(args.draft_year, args.k, args.block_size)
+    for position, comps in comps_by_position.items():
+        logging.info(f"📊 {len(comps)} {position}s in the {args.draft_year} class")
+    logging.info(f"⏱️ Computed comps in {time.perf_counter() - start_time:.3f}s")
+
+    write_comps_report(service, args.draft_year, comps_by_position, args.report or get_report_path(args.draft_year))
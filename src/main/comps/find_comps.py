@@ -0,0 +1,44 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add "src" to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from main.util.db_util import DatabaseUtility
+from main.maintenance.model_data import refresh_model_data
+from main.comps.comps_index import CompsService
+
+def print_comps(service, player_id, comps):
+    """ Prints one player's comps as a table, closest first. """
+    target = service.get_info(player_id)
+    print(f"\n{target['name']} ({player_id}, {target['draft_year']})")
+    print(f"{'player_id':>10}  {'name':<28}{'draft_year':>10}{'avg_fppg_nfl':>14}{'distance':>10}")
+    for comp, distance in comps:
+        fppg = "" if comp["avg_fppg_nfl"] is None else f"{float(comp['avg_fppg_nfl']):.2f}"
+        print(f"{comp['player_id']:>10}  {comp['name']:<28}{comp['draft_year'] or '':>10}{fppg:>14}{distance:>10.2f}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Find the closest comps of players from the model data.")
+    parser.add_argument("player_ids", nargs="*", type=int, help="Players to find comps for")
+    parser.add_argument("--draft-year", type=int, help="Find comps for every player of this draft class")
+    parser.add_argument("--positions", nargs="*", type=str.upper, help="Positions to load (default: RB WR TE)")
+    parser.add_argument("-k", type=int, default=20, help="Comps per player (default: 20)")
+    args = parser.parse_args()
+
+    if not args.player_ids and args.draft_year is None:
+        parser.error("give player ids and/or --draft-year")
+
+    with DatabaseUtility() as db_util:
+        refresh_model_data(db_util)
+        service = CompsService(db_util, args.positions)
+
+    comps = service.comps_for_players(args.player_ids, args.k)
+    if args.draft_year is not None:
+        comps.update(service.comps_for_draft_class(args.draft_year, args.k))
+
+    for player_id, player_comps in comps.items():
+        print_comps(service, player_id, player_comps)
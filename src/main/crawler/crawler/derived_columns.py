@@ -0,0 +1,129 @@
+# Derived columns of cfb_player_year_stats, recomputed after a crawl for what the crawl touched:
+#   season_age              - player's age on Aug 7 of the season (src/main/sql/update_season_ages.sql)
+#   team_yards_market_share - per-game share of the team's receiving yards (src/main/sql/update_team_yds_market_share.sql)
+#
+# BatchUpsertPipeline runs refresh_derived_columns when a spider closes. Example full recompute
+# (run from src/main/crawler), e.g. after editing rows by hand:
+#   python3 -m crawler.derived_columns
+#   python3 -m crawler.derived_columns --start-year 2023 --end-year 2024
+
+import time
+import logging
+import argparse
+from .util.db_util import DatabaseUtility
+
+SEASON_AGE_QUERY = """
+    UPDATE cfb_player_year_stats s
+    JOIN player p ON s.player_id = p.player_id
+    SET s.season_age = TIMESTAMPDIFF(YEAR, p.birthday, CAST(CONCAT(s.year, '-08-07') AS DATE))
+    WHERE p.birthday IS NOT NULL {filter}
+"""
+
+MARKET_SHARE_QUERY = """
+    UPDATE cfb_player_year_stats AS p
+    JOIN (
+        SELECT
+            team_id,
+            year,
+            SUM(rec_yds) AS total_team_rec_yards,
+            MAX(games_played) AS estimated_team_games -- Use max games played as an estimate
+        FROM cfb_player_year_stats
+        WHERE {filter}
+        GROUP BY team_id, year
+    ) AS t
+    ON p.team_id = t.team_id AND p.year = t.year
+    SET p.team_yards_market_share =
+        CASE
+            WHEN t.total_team_rec_yards > 0 AND p.games_played > 0 THEN
+                ((p.rec_yds / NULLIF(p.games_played, 0)) / (t.total_team_rec_yards / NULLIF(t.estimated_team_games, 0)))
+            ELSE 0
+        END
+"""
+
+def update_season_ages(db_util, player_ids=None, chunk_size=1000):
+    """
+    Recomputes season_age for every season of the given players (all players if None).
+    :return: Number of rows updated.
+    """
+    if player_ids is None:
+        db_util.cursor.execute(SEASON_AGE_QUERY.format(filter=""))
+        return db_util.cursor.rowcount
+
+    player_ids = sorted(player_ids)
+    updated = 0
+    for start in range(0, len(player_ids), chunk_size):
+        chunk = player_ids[start:start + chunk_size]
+        db_util.cursor.execute(
+            SEASON_AGE_QUERY.format(filter=f"AND s.player_id IN ({', '.join(['%s'] * len(chunk))})"), chunk
+        )
+        updated += db_util.cursor.rowcount
+    return updated
+
+def update_market_shares(db_util, team_years=None, chunk_size=500):
+    """
+    Recomputes team_yards_market_share for every player of the given (team_id, year) groups
+    (all groups if None). The team totals are only aggregated over those groups.
+    :return: Number of rows updated.
+    """
+    if team_years is None:
+        db_util.cursor.execute(MARKET_SHARE_QUERY.format(filter="TRUE"))
+        return db_util.cursor.rowcount
+
+    team_years = sorted(team_years)
+    updated = 0
+    for start in range(0, len(team_years), chunk_size):
+        chunk = team_years[start:start + chunk_size]
+        params = [value for team_year in chunk for value in team_year]
+        db_util.cursor.execute(
+            MARKET_SHARE_QUERY.format(filter=f"(team_id, year) IN ({', '.join(['(%s, %s)'] * len(chunk))})"), params
+        )
+        updated += db_util.cursor.rowcount
+    return updated
+
+def get_team_years(db_util, start_year, end_year):
+    db_util.cursor.execute("""
+        SELECT DISTINCT team_id, year FROM cfb_player_year_stats WHERE year BETWEEN %s AND %s
+    """, (start_year, end_year))
+    return db_util.cursor.fetchall()
+
+def get_player_ids(db_util, start_year, end_year):
+    db_util.cursor.execute("""
+        SELECT DISTINCT player_id FROM cfb_player_year_stats WHERE year BETWEEN %s AND %s
+    """, (start_year, end_year))
+    return [row[0] for row in db_util.cursor.fetchall()]
+
+def refresh_derived_columns(db_util, player_ids=None, team_years=None):
+    """
+    Recomputes the derived columns in one transaction.
+    :param player_ids: Players whose birthday or seasons changed (None for all players).
+    :param team_years: (team_id, year) groups whose seasons changed (None for all groups).
+    """
+    start_time = time.perf_counter()
+    try:
+        ages = update_season_ages(db_util, player_ids)
+        shares = update_market_shares(db_util, team_years)
+        db_util.conn.commit()
+    except Exception:
+        db_util.conn.rollback()
+        raise
+
+    logging.info(f"✅ Updated season_age on {ages} rows and team_yards_market_share on {shares} rows "
+                 f"in {time.perf_counter() - start_time:.2f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Recompute season_age and team_yards_market_share.")
+    parser.add_argument("--start-year", type=int, help="Only recompute seasons from this year on")
+    parser.add_argument("--end-year", type=int, help="Only recompute seasons up to this year")
+    args = parser.parse_args()
+
+    with DatabaseUtility() as db_util:
+        if args.start_year is None and args.end_year is None:
+            refresh_derived_columns(db_util)
+        else:
+            start_year = args.start_year or 0
+            end_year = args.end_year or 9999
+            refresh_derived_columns(db_util, get_player_ids(db_util, start_year, end_year),
+                                    get_team_years(db_util, start_year, end_year))
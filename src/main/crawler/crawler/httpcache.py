@@ -0,0 +1,139 @@
+# On-disk page cache for the spiders (HTTPCACHE_STORAGE) and the offline replay switch
+#
+# Settings (see settings.py):
+#   HTTPCACHE_DIR                  - cache directory inside the project's .scrapy/ data dir
+#   HTTPCACHE_CURRENT_SEASON_TTL   - seconds before pages of the current (or a future) season are refetched
+#   HTTPCACHE_DEFAULT_TTL          - seconds before pages without a season in the URL (player pages) are refetched
+#   HTTPCACHE_CURRENT_SEASON       - override for the current season (defaults to the calendar)
+#   HTTPCACHE_OFFLINE              - replay from the cache only: nothing expires and cache misses are dropped
+#
+# Example: re-run parsing from cached pages only
+#   scrapy crawl cfb_player_spider -s HTTPCACHE_OFFLINE=True
+
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+import logging
+from datetime import date
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+
+# Season in sports-reference URLs, e.g. /cfb/schools/alabama/2023.html, /teams/kan/2023.htm, /years/2023/draft.htm
+SEASON_URL_PATTERN = re.compile(r"/((?:19|20)\d{2})(?:\.html?$|/)")
+
+
+def get_current_season(today=None):
+    """ Seasons are named after the year they start in; from March on the new year's season is current. """
+    today = today or date.today()
+    return today.year if today.month >= 3 else today.year - 1
+
+
+class ContentAddressedCacheStorage:
+    """
+    Scrapy cache storage that keeps each distinct page body once, gzip-compressed and named by
+    its sha256, with a small JSON index entry per request fingerprint pointing at it.
+    Pages of past seasons never expire; the current season and season-less pages use a TTL.
+    """
+
+    def __init__(self, settings):
+        self.cache_dir = data_path(settings["HTTPCACHE_DIR"], createdir=True)
+        self.current_season_ttl = settings.getint("HTTPCACHE_CURRENT_SEASON_TTL", 24 * 60 * 60)
+        self.default_ttl = settings.getint("HTTPCACHE_DEFAULT_TTL", 7 * 24 * 60 * 60)
+        self.current_season = settings.getint("HTTPCACHE_CURRENT_SEASON") or get_current_season()
+        self.offline = settings.getbool("HTTPCACHE_OFFLINE")
+        self.fingerprinter = None
+
+    def open_spider(self, spider):
+        self.fingerprinter = spider.crawler.request_fingerprinter
+        logging.info(f"Using page cache in {self.cache_dir} (offline: {self.offline})")
+
+    def close_spider(self, spider):
+        pass
+
+    def get_ttl(self, url):
+        """ :return: Seconds a cached page of this URL stays fresh, or None if it never expires. """
+        match = SEASON_URL_PATTERN.search(url)
+        if not match:
+            return self.default_ttl
+        return None if int(match.group(1)) < self.current_season else self.current_season_ttl
+
+    def index_path(self, request):
+        key = self.fingerprinter.fingerprint(request).hex()
+        return os.path.join(self.cache_dir, "index", key[:2], f"{key}.json")
+
+    def body_path(self, body_hash):
+        return os.path.join(self.cache_dir, "objects", body_hash[:2], f"{body_hash}.gz")
+
+    def retrieve_response(self, spider, request):
+        index_path = self.index_path(request)
+        if not os.path.exists(index_path):
+            return None
+
+        with open(index_path, mode="r", encoding="utf-8") as file:
+            entry = json.load(file)
+
+        ttl = self.get_ttl(entry["url"])
+        if not self.offline and ttl is not None and time.time() - entry["stored_at"] > ttl:
+            return None
+
+        body_path = self.body_path(entry["body_sha256"])
+        if not os.path.exists(body_path):
+            return None
+        with gzip.open(body_path, mode="rb") as file:
+            body = file.read()
+
+        headers = Headers(entry["headers"])
+        response_class = responsetypes.from_args(headers=headers, url=entry["url"], body=body)
+        return response_class(url=entry["url"], headers=headers, status=entry["status"], body=body)
+
+    def store_response(self, spider, request, response):
+        body_hash = hashlib.sha256(response.body).hexdigest()
+        body_path = self.body_path(body_hash)
+        if not os.path.exists(body_path):
+            self.write_atomic(body_path, gzip.compress(response.body))
+
+        entry = {
+            "url": response.url,
+            "status": response.status,
+            "headers": {key.decode("latin1"): [value.decode("latin1") for value in values]
+                        for key, values in response.headers.items()},
+            "body_sha256": body_hash,
+            "stored_at": time.time(),
+        }
+        self.write_atomic(self.index_path(request), json.dumps(entry).encode("utf-8"))
+
+    def write_atomic(self, path, data):
+        # Written to a temporary file first so an interrupted crawl never leaves a truncated cache entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, mode="wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+
+class OfflineCacheMiddleware:
+    """
+    Downloader middleware that runs right after HttpCacheMiddleware when HTTPCACHE_OFFLINE is set.
+    Only cache misses get this far, so dropping them keeps an offline run off the network.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("HTTPCACHE_OFFLINE"):
+            raise NotConfigured
+        if not crawler.settings.getbool("HTTPCACHE_ENABLED"):
+            raise NotConfigured("HTTPCACHE_OFFLINE requires HTTPCACHE_ENABLED")
+        return cls(crawler.stats)
+
+    def process_request(self, request, spider):
+        self.stats.inc_value("httpcache/offline_miss", spider=spider)
+        logging.debug("Offline: %s is not cached, skipping.", request.url)
+        raise IgnoreRequest(f"Not in the page cache (offline): {request.url}")
@@ -0,0 +1,174 @@
+import os
+import csv
+import time
+import logging
+import argparse
+from ..util.db_util import DatabaseUtility
+from ..util.crawler_util import PlayerNameIndex, get_tprr, write_missing_players
+
+# PFF CSV column -> stats table column, per data type
+PFF_FIELD_MAPPINGS = {
+    "receiving": {
+        "grades_pass_route": "pff_rec_grade",
+        "yards_after_catch_per_reception": "yac_per_rec",
+        "yprr": "yprr",
+        "tprr": "tprr",
+        "grades_offense": "pff_off_grade",
+    },
+    "rushing": {
+        "yco_attempt": "yac_per_att",
+        "grades_run": "pff_run_grade",
+        "ypa": "ypa",
+        "elusive_rating": "elu_rtg",
+        "grades_offense": "pff_off_grade",
+    },
+}
+
+# PFF positions we track ("HB" is PFF's name for RB)
+PFF_POSITIONS = {"HB", "WR", "TE"}
+
+MISSING_PLAYER_FIELDS = ["year", "player", "pff_id", "rush_grade", "rec_grade", "team"]
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/pff"))
+MISSING_PLAYERS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../missing_players"))
+
+def get_field_mapping(data_type):
+    """ Returns the CSV -> DB field mapping for a PFF data type (receiving or rushing). """
+    if data_type not in PFF_FIELD_MAPPINGS:
+        raise ValueError(f"Unsupported data type: {data_type}")
+    return PFF_FIELD_MAPPINGS[data_type]
+
+def get_data_dir(table_name, data_type):
+    return os.path.join(DATA_DIR, table_name.split('_')[0], data_type)
+
+def get_missing_players_file(table_name, data_type):
+    return os.path.join(MISSING_PLAYERS_DIR, f"pff_missing_{table_name.split('_')[0]}_{data_type}_players.csv")
+
+def read_pff_columns(file_path):
+    """
+    Reads a whole PFF export into columns.
+    :return: Dict of CSV column -> list of values, with blank cells as None.
+    """
+    with open(file_path, mode="r", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        rows = [[value if value != "" else None for value in row] for row in reader]
+
+    return {column: list(values) for column, values in zip(header, zip(*rows))} if rows else {column: [] for column in header}
+
+def add_tprr_column(columns):
+    """
+    Adds a tprr (targets per route run) column when the export has routes and targets.
+    :return: Set of row indices with blank or non-numeric routes/targets (tprr None). The per-row
+             spider failed on float('') for blank cells and skipped those rows, so the ingest skips them too.
+    """
+    if "routes" not in columns or "targets" not in columns:
+        return set()
+
+    tprr = []
+    invalid_rows = set()
+    for i, (routes, targets) in enumerate(zip(columns["routes"], columns["targets"])):
+        try:
+            tprr.append(get_tprr(float(targets), float(routes)))
+        except (TypeError, ValueError):
+            tprr.append(None)
+            invalid_rows.add(i)
+    columns["tprr"] = tprr
+    return invalid_rows
+
+def ingest_pff_file(db_util, name_index, file_path, year, table_name, data_type):
+    """
+    Loads one PFF year file: resolves every row against the preloaded player-year index and
+    applies all updates in a single bulk update (one transaction). Blank values never overwrite existing data.
+    :return: (rows updated, list of missing player dicts)
+    """
+    logging.info(f"Processing file: {file_path}")
+    field_mapping = get_field_mapping(data_type)
+    columns = read_pff_columns(file_path)
+    invalid_tprr_rows = add_tprr_column(columns)
+
+    row_count = len(next(iter(columns.values()), []))
+
+    def column(name):
+        return columns.get(name, [None] * row_count)
+
+    csv_fields = list(field_mapping)
+    db_fields = [field_mapping[csv_field] for csv_field in csv_fields]
+    mapped_columns = [column(csv_field) for csv_field in csv_fields]
+
+    updates = []
+    missing_players = []
+    rows = zip(column("player"), column("franchise_id"), column("position"), column("grades_run"),
+               column("grades_pass_route"), column("team_name"), zip(*mapped_columns))
+    for i, (player_name, franchise_id, position, run_grade, rec_grade, team, values) in enumerate(rows):
+        # Skip irrelevant positions
+        if position not in PFF_POSITIONS:
+            continue
+
+        if not player_name or not franchise_id:
+            logging.warning(f"Missing player or franchise ID for {player_name} in {file_path}")
+            continue
+
+        if i in invalid_tprr_rows:
+            logging.warning(f"Invalid routes/targets for player {player_name} in {file_path}")
+            continue
+
+        player_year_id = name_index.find_player_year_id(player_name, franchise_id, year, table_name)
+        if not player_year_id:
+            missing_players.append({
+                "year": year,
+                "player": player_name,
+                "pff_id": franchise_id,
+                "rush_grade": run_grade,
+                "rec_grade": rec_grade,
+                "team": team
+            })
+            continue
+
+        updates.append((player_year_id, *values))
+
+    updated = db_util.bulk_update(table_name, "player_year_id", db_fields, updates, coalesce=True)
+    logging.info(f"✅ {os.path.basename(file_path)}: matched {len(updates)} rows ({updated} changed), "
+                 f"{len(missing_players)} missing.")
+    return updated, missing_players
+
+def ingest_pff_years(db_util, table_name, data_type, start_year, end_year, name_index=None):
+    """
+    Loads the PFF files of a table/data type for a range of years.
+    :param name_index: Optional preloaded PlayerNameIndex (built here if not given).
+    :return: List of missing player dicts across all files.
+    """
+    start_time = time.perf_counter()
+    data_dir = get_data_dir(table_name, data_type)
+    logging.info(f"Resolved data directory: {data_dir}")
+
+    name_index = name_index or PlayerNameIndex(db_util)
+    missing_players = []
+    total_updated = 0
+    for year in range(int(start_year), int(end_year) + 1):
+        file_path = os.path.join(data_dir, f"{year}.csv")
+        if not os.path.exists(file_path):
+            logging.warning(f"File not found: {file_path}. Skipping.")
+            continue
+
+        updated, missing = ingest_pff_file(db_util, name_index, file_path, year, table_name, data_type)
+        total_updated += updated
+        missing_players.extend(missing)
+
+    logging.info(f"🚀 PFF {data_type} ingest into {table_name} done in {time.perf_counter() - start_time:.1f}s: "
+                 f"{total_updated} rows changed, {len(missing_players)} missing players.")
+    return missing_players
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Bulk load PFF grades into a player stats table.")
+    parser.add_argument("--table-name", required=True, help="e.g. cfb_player_year_stats or nfl_player_year_stats")
+    parser.add_argument("--data-type", required=True, choices=sorted(PFF_FIELD_MAPPINGS))
+    parser.add_argument("--start-year", type=int, required=True)
+    parser.add_argument("--end-year", type=int, required=True)
+    args = parser.parse_args()
+
+    with DatabaseUtility() as db_util:
+        missing = ingest_pff_years(db_util, args.table_name, args.data_type, args.start_year, args.end_year)
+    write_missing_players(get_missing_players_file(args.table_name, args.data_type), missing, MISSING_PLAYER_FIELDS)
@@ -0,0 +1,100 @@
+import os
+import csv
+import time
+import logging
+import argparse
+from ..util.db_util import DatabaseUtility
+from ..util.crawler_util import PlayerNameIndex, write_missing_players
+
+RAS_POSITIONS = ("rb", "wr", "te")
+
+MISSING_PLAYER_FIELDS = ["year", "player", "ras"]
+
+DATA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../data/ras"))
+MISSING_PLAYERS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../missing_players"))
+
+def get_missing_players_file(position):
+    return os.path.join(MISSING_PLAYERS_DIR, f"ras_missing_players_{position}.csv")
+
+def read_ras_file(file_path):
+    """
+    Reads the name and RAS columns of a ras.football export.
+    :return: List of (player name, RAS score) with blank or invalid scores dropped.
+    """
+    scores = []
+    # The exports start with a byte order mark
+    with open(file_path, mode="r", encoding="utf-8-sig") as file:
+        for row in csv.DictReader(file):
+            player_name = row.get("Name")
+            ras_score = row.get("RAS")
+            if not ras_score:
+                logging.debug("No RAS score found for player %s", player_name)
+                continue
+
+            try:
+                scores.append((player_name, float(ras_score)))
+            except ValueError:
+                logging.warning(f"Invalid RAS score for player {player_name}: {ras_score}")
+    return scores
+
+def ingest_ras(db_util, start_year, end_year, positions=RAS_POSITIONS, name_index=None):
+    """
+    Loads the RAS files of every requested position and year. All files are read first, names are
+    resolved against one preloaded PlayerNameIndex, and each file is written with one bulk update.
+    :return: Dict of position -> list of missing player dicts.
+    """
+    start_time = time.perf_counter()
+    files = []
+    for position in positions:
+        for year in range(int(start_year), int(end_year) + 1):
+            file_path = os.path.join(DATA_DIR, position.lower(), f"{year}.csv")
+            if not os.path.exists(file_path):
+                logging.warning(f"File not found: {file_path}. Skipping.")
+                continue
+            files.append((position.lower(), year, read_ras_file(file_path)))
+    read_time = time.perf_counter()
+
+    name_index = name_index or PlayerNameIndex(db_util)
+    index_time = time.perf_counter()
+
+    missing_players = {position.lower(): [] for position in positions}
+    total_rows = total_matched = total_updated = 0
+    for position, year, scores in files:
+        updates = []
+        for player_name, ras_score in scores:
+            player_id = name_index.find_player_id(player_name)
+            if player_id:
+                updates.append((player_id, ras_score))
+            else:
+                missing_players[position].append({"year": year, "player": player_name, "ras": ras_score})
+
+        updated = db_util.bulk_update("player", "player_id", ["ras"], updates)
+        match_rate = len(updates) / len(scores) if scores else 1.0
+        logging.info(f"📊 RAS {position.upper()} {year}: matched {len(updates)}/{len(scores)} ({match_rate:.1%}), "
+                     f"{updated} changed.")
+        total_rows += len(scores)
+        total_matched += len(updates)
+        total_updated += updated
+
+    end_time = time.perf_counter()
+    match_rate = total_matched / total_rows if total_rows else 1.0
+    logging.info(f"✅ RAS load: {len(files)} files, matched {total_matched}/{total_rows} ({match_rate:.1%}), "
+                 f"{total_updated} players changed.")
+    logging.info(f"⏱️ Read files {read_time - start_time:.2f}s, built name index {index_time - read_time:.2f}s, "
+                 f"matched and wrote {end_time - index_time:.2f}s, total {end_time - start_time:.2f}s.")
+    return missing_players
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Bulk load RAS scores into the player table.")
+    parser.add_argument("--start-year", type=int, required=True)
+    parser.add_argument("--end-year", type=int, required=True)
+    parser.add_argument("positions", nargs="*", default=list(RAS_POSITIONS),
+                        help="Positions to load, e.g. rb wr (default: rb wr te)")
+    args = parser.parse_args()
+
+    with DatabaseUtility() as db_util:
+        missing = ingest_ras(db_util, args.start_year, args.end_year, args.positions)
+    for position, players in missing.items():
+        write_missing_players(get_missing_players_file(position), players, MISSING_PLAYER_FIELDS)
@@ -3,7 +3,14 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import time
+import random
+import asyncio
+import logging
+from urllib.parse import urlparse
 from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from scrapy.downloadermiddlewares.retry import RetryMiddleware
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
@@ -101,3 +108,81 @@ class CrawlerDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class TokenBucketMiddleware:
+    """
+    Per-host token bucket rate limit (TOKEN_BUCKET_RATES = {host: {'rate': per second, 'burst': tokens}}).
+    Runs after the cache middlewares, so only requests that really go to the network wait for a token.
+    """
+
+    def __init__(self, rates):
+        self.buckets = {
+            host: {'rate': float(limits['rate']), 'burst': float(limits.get('burst', 1)),
+                   'tokens': float(limits.get('burst', 1)), 'updated': time.monotonic()}
+            for host, limits in rates.items()
+        }
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        rates = crawler.settings.getdict("TOKEN_BUCKET_RATES")
+        if not rates:
+            raise NotConfigured
+        return cls(rates)
+
+    def reserve(self, host):
+        """ Takes a token for the host and returns how many seconds to wait until it is available. """
+        bucket = self.buckets.get(host)
+        if not bucket:
+            return 0.0
+
+        now = time.monotonic()
+        bucket['tokens'] = min(bucket['burst'], bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+        bucket['updated'] = now
+        bucket['tokens'] -= 1
+        # A negative balance is a reservation: the request waits until the bucket has refilled to zero
+        return max(0.0, -bucket['tokens'] / bucket['rate'])
+
+    async def process_request(self, request, spider):
+        wait = self.reserve(urlparse(request.url).hostname)
+        if wait > 0:
+            logging.debug("Rate limit: waiting %.1fs for %s", wait, request.url)
+            await asyncio.sleep(wait)
+        return None
+
+
+class BackoffRetryMiddleware(RetryMiddleware):
+    """
+    RetryMiddleware that waits before each retry: RETRY_BACKOFF_BASE * 2^(attempt - 1) seconds with jitter,
+    capped at RETRY_BACKOFF_MAX, or the server's Retry-After if that is longer.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.backoff_base = settings.getfloat("RETRY_BACKOFF_BASE", 5.0)
+        self.backoff_max = settings.getfloat("RETRY_BACKOFF_MAX", 120.0)
+
+    def backoff_delay(self, retry_request, response=None):
+        attempt = retry_request.meta.get("retry_times", 1)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(self.backoff_max, float(retry_after)))
+        return delay
+
+    async def process_response(self, request, response, spider):
+        result = super().process_response(request, response, spider)
+        if result is not response:
+            delay = self.backoff_delay(result, response)
+            logging.info(f"🔄 Retrying {request.url} (status {response.status}) in {delay:.0f}s")
+            await asyncio.sleep(delay)
+        return result
+
+    async def process_exception(self, request, exception, spider):
+        result = super().process_exception(request, exception, spider)
+        if result is not None:
+            delay = self.backoff_delay(result)
+            logging.info(f"🔄 Retrying {request.url} ({type(exception).__name__}) in {delay:.0f}s")
+            await asyncio.sleep(delay)
+        return result
@@ -3,11 +3,271 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import logging
+from twisted.internet import defer, reactor, task, threads
+from twisted.python.threadpool import ThreadPool
+from .util.db_util import DatabaseUtility
+from .derived_columns import refresh_derived_columns
+from .spiders.items import PlayerItem, DraftItem, CfbSeasonItem, NflSeasonItem, TeamYearItem
 
-# useful for handling different item types with a single interface
-from itemadapter import ItemAdapter
+# How each item type is written: table, (item field, column) pairs, columns updated when the
+# unique key already exists, and how they are updated:
+#   fill      - only fill columns that are still NULL in the DB
+#   non_null  - overwrite with the scraped value unless it is NULL
+#   overwrite - always overwrite
+# sr_id on season items is resolved to player_id when the batch is written.
+# The unique keys these upserts rely on are added by src/main/sql/crawler_unique_keys.sql
+ITEM_UPSERTS = {
+    PlayerItem: {
+        "table": "player",
+        "columns": [("sr_id", "sr_id"), ("name", "name"), ("position", "position"), ("height", "height"),
+                    ("weight", "weight")],
+        "update_columns": ["position", "height", "weight"],
+        "mode": "fill",
+    },
+    DraftItem: {
+        "table": "player",
+        "columns": [("sr_id", "sr_id"), ("name", "name"), ("draft_cap", "draft_cap"), ("draft_year", "draft_year"),
+                    ("height", "height"), ("weight", "weight"), ("birthday", "birthday")],
+        "update_columns": ["draft_cap", "draft_year", "height", "weight", "birthday"],
+        "mode": "non_null",
+    },
+    TeamYearItem: {
+        "table": "team_year_stats",
+        "columns": [("team_id", "team_id"), ("year", "year"), ("team_sos", "team_sos"), ("team_srs", "team_srs")],
+        "update_columns": ["team_sos", "team_srs"],
+        "mode": "overwrite",
+    },
+    CfbSeasonItem: {
+        "table": "cfb_player_year_stats",
+        "columns": [("sr_id", "player_id"), ("team_id", "team_id"), ("year", "year"), ("player_class", "class"),
+                    ("games_played", "games_played"), ("rec_yds", "rec_yds"), ("receptions", "receptions"),
+                    ("rush_yds", "rush_yds"), ("rush_att", "rush_att"), ("rush_td", "rush_td"), ("rec_td", "rec_td")],
+        "update_columns": ["team_id", "class", "games_played", "rec_yds", "receptions", "rush_yds", "rush_att",
+                           "rush_td", "rec_td"],
+        "mode": "overwrite",
+    },
+    NflSeasonItem: {
+        "table": "nfl_player_year_stats",
+        "columns": [("sr_id", "player_id"), ("team_id", "team_id"), ("year", "year"),
+                    ("games_played", "games_played"), ("rec_yds", "rec_yds"), ("receptions", "receptions"),
+                    ("rush_yds", "rush_yds"), ("rush_att", "rush_att"), ("rush_td", "rush_td"), ("rec_td", "rec_td")],
+        "update_columns": ["games_played", "rec_yds", "receptions", "rush_yds", "rush_att", "rush_td", "rec_td"],
+        "mode": "overwrite",
+    },
+}
 
+# Players are written before the seasons that reference them
+WRITE_ORDER = [PlayerItem, DraftItem, TeamYearItem, CfbSeasonItem, NflSeasonItem]
+
+UPDATE_EXPRESSIONS = {
+    "fill": "{column} = COALESCE({column}, VALUES({column}))",
+    "non_null": "{column} = COALESCE(VALUES({column}), {column})",
+    "overwrite": "{column} = VALUES({column})",
+}
+
+
+def resolve_player_ids(db_util, sr_ids, chunk_size=1000):
+    """ Maps sr_ids to player_ids with one IN query per chunk. """
+    sr_ids = list(sr_ids)
+    player_ids = {}
+    for start in range(0, len(sr_ids), chunk_size):
+        chunk = sr_ids[start:start + chunk_size]
+        db_util.cursor.execute(
+            f"SELECT sr_id, player_id FROM player WHERE sr_id IN ({', '.join(['%s'] * len(chunk))})", chunk
+        )
+        player_ids.update(db_util.cursor.fetchall())
+    return player_ids
+
+
+def upsert_items(db_util, item_class, items, chunk_size=500):
+    """
+    Writes items of one type with multi-row INSERT ... ON DUPLICATE KEY UPDATE statements.
+    Season items whose sr_id is not in the player table are skipped.
+    :return: (number of items written, number of items skipped for an unresolved sr_id)
+    """
+    spec = ITEM_UPSERTS[item_class]
+    fields = [field for field, _ in spec["columns"]]
+    columns = [column for _, column in spec["columns"]]
+    rows = [[item.get(field) for field in fields] for item in items]
+    unresolved = 0
+
+    # Season items reference their player by sr_id
+    if "player_id" in columns:
+        index = columns.index("player_id")
+        player_ids = resolve_player_ids(db_util, {row[index] for row in rows if row[index]})
+        for row in rows:
+            if row[index] not in player_ids:
+                logging.warning(f"Player with sr_id {row[index]} not found in DB. Skipping {spec['table']} row.")
+                unresolved += 1
+        rows = [row[:index] + [player_ids[row[index]]] + row[index + 1:] for row in rows if row[index] in player_ids]
+
+    if not rows:
+        return 0, unresolved
+
+    update_clause = ", ".join(UPDATE_EXPRESSIONS[spec["mode"]].format(column=column) for column in spec["update_columns"])
+    query = f"""
+        INSERT INTO {spec['table']} ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON DUPLICATE KEY UPDATE {update_clause}
+    """
+    # executemany rewrites INSERT ... VALUES into a single multi-row INSERT per chunk
+    for start in range(0, len(rows), chunk_size):
+        db_util.cursor.executemany(query, rows[start:start + chunk_size])
+    return len(rows), unresolved
+
+
+class BatchUpsertPipeline:
+    """
+    Buffers items and writes them in batches on a single background thread, so parse callbacks
+    never wait on MySQL. Buffers are flushed when they reach DB_BATCH_SIZE items, every
+    DB_FLUSH_INTERVAL seconds, and when the spider closes.
+    With DB_REFRESH_DERIVED_COLUMNS, the derived columns of the players and team-years the
+    crawl wrote are recomputed once everything is written (see crawler/derived_columns.py).
+    """
+
+    def __init__(self, batch_size=500, flush_interval=5.0, refresh_derived=True, stats=None):
+        self.stats = stats
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.refresh_derived = refresh_derived
+        self.touched_sr_ids = set()
+        self.touched_team_years = set()
+        self.buffers = {item_class: [] for item_class in WRITE_ORDER}
+        self.buffered = 0
+        self.pending_writes = set()
+        self.db_util = None
+        self.threadpool = None
+        self.flush_loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            batch_size=crawler.settings.getint("DB_BATCH_SIZE", 500),
+            flush_interval=crawler.settings.getfloat("DB_FLUSH_INTERVAL", 5.0),
+            refresh_derived=crawler.settings.getbool("DB_REFRESH_DERIVED_COLUMNS", True),
+            stats=crawler.stats,
+        )
+
+    def open_spider(self, spider):
+        self.db_util = DatabaseUtility()
+
+        # A single thread keeps the writes in order and the connection on one thread at a time
+        self.threadpool = ThreadPool(minthreads=1, maxthreads=1, name="db-writer")
+        self.threadpool.start()
+
+        self.flush_loop = task.LoopingCall(self.flush)
+        self.flush_loop.start(self.flush_interval, now=False)
 
-class CrawlerPipeline:
     def process_item(self, item, spider):
+        item_class = type(item)
+        if item_class in self.buffers:
+            self.buffers[item_class].append(item)
+            self.buffered += 1
+            self.track_derived(item)
+            if self.buffered >= self.batch_size:
+                self.flush()
         return item
+
+    def track_derived(self, item):
+        """ Remembers what a written item invalidates: season_age depends on the birthday and the seasons,
+        team_yards_market_share on every season of the same team and year. """
+        if isinstance(item, DraftItem) and item.get("birthday"):
+            self.touched_sr_ids.add(item["sr_id"])
+        elif isinstance(item, CfbSeasonItem):
+            self.touched_sr_ids.add(item["sr_id"])
+            self.touched_team_years.add((item["team_id"], int(item["year"])))
+
+    def flush(self):
+        """ Hands the buffered items to the writer thread and starts new buffers. """
+        if not self.buffered:
+            return
+
+        batches = [(item_class, self.buffers[item_class]) for item_class in WRITE_ORDER if self.buffers[item_class]]
+        self.buffers = {item_class: [] for item_class in WRITE_ORDER}
+        self.buffered = 0
+
+        write = threads.deferToThreadPool(reactor, self.threadpool, self.write_batches, batches)
+        write.addCallbacks(self.record_rejected, self.batch_failed)
+        self.pending_writes.add(write)
+        write.addBoth(lambda result: self.pending_writes.discard(write))
+
+    def write_batches(self, batches):
+        """
+        Runs on the writer thread: upserts one batch of every item type in a single transaction.
+        If that fails, each item type is retried on its own and a failing type row by row,
+        so one bad value only loses its own row.
+        :return: (list of (item, error message) pairs that could not be written,
+                  dict item type name -> number of items skipped for an unresolved sr_id)
+        """
+        try:
+            results = {item_class.__name__: upsert_items(self.db_util, item_class, items) for item_class, items in batches}
+            self.db_util.conn.commit()
+            written = {name: written for name, (written, _) in results.items()}
+            logging.info(f"✅ Wrote item batch: {written}")
+            return [], {name: unresolved for name, (_, unresolved) in results.items() if unresolved}
+        except Exception as e:
+            self.db_util.conn.rollback()
+            logging.warning(f"⚠️ Item batch failed ({e}), retrying each item type separately.")
+
+        rejected = []
+        unresolved = {}
+        for item_class, items in batches:
+            name = item_class.__name__
+            try:
+                _, skipped = upsert_items(self.db_util, item_class, items)
+                self.db_util.conn.commit()
+                unresolved[name] = skipped
+                continue
+            except Exception:
+                self.db_util.conn.rollback()
+
+            unresolved[name] = 0
+            for item in items:
+                try:
+                    _, skipped = upsert_items(self.db_util, item_class, [item])
+                    self.db_util.conn.commit()
+                    unresolved[name] += skipped
+                except Exception as e:
+                    self.db_util.conn.rollback()
+                    rejected.append((item, str(e)))
+        return rejected, {name: skipped for name, skipped in unresolved.items() if skipped}
+
+    def record_rejected(self, result):
+        """ Runs on the reactor thread with the items write_batches could not write or had to skip. """
+        rejected, unresolved = result
+        for item, error in rejected:
+            logging.error(f"Rejected {type(item).__name__} {dict(item)}: {error}")
+            self.stats.inc_value(f"db/rejected_items/{type(item).__name__}")
+        if rejected:
+            self.stats.inc_value("db/rejected_items", len(rejected))
+        for name, skipped in unresolved.items():
+            self.stats.inc_value(f"db/unresolved_sr_id/{name}", skipped)
+
+    def batch_failed(self, failure):
+        logging.error(f"Error writing item batch: {failure.getErrorMessage()}")
+        self.stats.inc_value("db/failed_batches")
+
+    def write_derived_columns(self):
+        """ Runs on the writer thread: recomputes the derived columns for what this crawl touched. """
+        player_ids = resolve_player_ids(self.db_util, self.touched_sr_ids)
+        logging.info(f"🔄 Refreshing derived columns for {len(player_ids)} players "
+                     f"and {len(self.touched_team_years)} team-years...")
+        refresh_derived_columns(self.db_util, set(player_ids.values()), self.touched_team_years)
+
+    @defer.inlineCallbacks
+    def close_spider(self, spider):
+        if self.flush_loop and self.flush_loop.running:
+            self.flush_loop.stop()
+
+        self.flush()
+        yield defer.DeferredList(list(self.pending_writes))
+
+        if self.refresh_derived and (self.touched_sr_ids or self.touched_team_years):
+            try:
+                yield threads.deferToThreadPool(reactor, self.threadpool, self.write_derived_columns)
+            except Exception as e:
+                logging.error(f"Error refreshing derived columns: {e}")
+
+        yield threads.deferToThreadPool(reactor, self.threadpool, self.db_util.close_connection)
+        self.threadpool.stop()
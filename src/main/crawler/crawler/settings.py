@@ -50,9 +50,19 @@ COOKIES_ENABLED = True
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "crawler.middlewares.CrawlerDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    # Retries wait with exponential backoff (RETRY_BACKOFF_BASE / RETRY_BACKOFF_MAX)
+    "scrapy.downloadermiddlewares.retry.RetryMiddleware": None,
+    "crawler.middlewares.BackoffRetryMiddleware": 550,
+    # Runs right after HttpCacheMiddleware (900) and drops cache misses when HTTPCACHE_OFFLINE is set
+    "crawler.httpcache.OfflineCacheMiddleware": 950,
+    # Per-host rate limit (TOKEN_BUCKET_RATES), only for requests not served from the cache
+    "crawler.middlewares.TokenBucketMiddleware": 960,
+}
+
+# Crawl profiles (polite, backfill, offline-cache, local) are defined in crawler/util/crawler_util.py.
+# Every spider has a default profile; pick another with -s CRAWL_PROFILE=backfill
+#CRAWL_PROFILE = "polite"
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -62,9 +72,15 @@ COOKIES_ENABLED = True
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "crawler.pipelines.CrawlerPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "crawler.pipelines.BatchUpsertPipeline": 300,
+}
+
+# Items buffered by BatchUpsertPipeline before a write, and the max seconds between writes
+DB_BATCH_SIZE = 500
+DB_FLUSH_INTERVAL = 5.0
+# Recompute season_age and team_yards_market_share for the players and team-years a crawl wrote when it closes
+DB_REFRESH_DERIVED_COLUMNS = True
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -81,11 +97,16 @@ COOKIES_ENABLED = True
 
 # Enable and configure HTTP caching (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# Pages are cached under .scrapy/httpcache, see crawler/httpcache.py
+HTTPCACHE_ENABLED = True
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_IGNORE_HTTP_CODES = [429, 500, 502, 503, 504]
+HTTPCACHE_STORAGE = "crawler.httpcache.ContentAddressedCacheStorage"
+# Past seasons never expire; the current season is refetched after a day, season-less pages after a week
+HTTPCACHE_CURRENT_SEASON_TTL = 24 * 60 * 60
+HTTPCACHE_DEFAULT_TTL = 7 * 24 * 60 * 60
+# Replay from the cache only (scrapy crawl ... -s HTTPCACHE_OFFLINE=True)
+HTTPCACHE_OFFLINE = False
 
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
@@ -2,10 +2,12 @@ import scrapy
 import logging
 from ..util.db_util import DatabaseUtility
 from ..util.crawler_util import *
+from .items import PlayerItem, CfbSeasonItem
 from urllib.parse import quote_plus
+from collections import defaultdict
 import re
 
-class CollegePlayerSpider(scrapy.Spider):
+class CollegePlayerSpider(CrawlProfileMixin, scrapy.Spider):
     name = 'cfb_player_spider'
     custom_settings = get_custom_settings()
 
@@ -17,7 +19,46 @@ class CollegePlayerSpider(scrapy.Spider):
         # Initialize the database connection using the utility class
         self.db_util = DatabaseUtility(dictionary=False)
 
+        self.team_ids = {}             # team name -> team_id
+        self.known_seasons = defaultdict(set)  # sr_id -> years already in cfb_player_year_stats or already yielded
+
+    def load_lookups(self):
+        """ Loads the team names and existing player seasons once, so parsing a row needs no DB round trips. """
+        self.db_util.cursor.execute("SELECT team_id, team_name FROM team ORDER BY team_id")
+        for team_id, team_name in self.db_util.cursor.fetchall():
+            # Team names compare case-insensitively in MySQL; the lowest team_id wins like the old lookup
+            self.team_ids.setdefault(team_name.casefold(), team_id)
+
+        self.db_util.cursor.execute("""
+            SELECT p.sr_id, c.year
+            FROM cfb_player_year_stats c
+            JOIN player p ON c.player_id = p.player_id
+        """)
+        for sr_id, year in self.db_util.cursor.fetchall():
+            self.known_seasons[sr_id].add(int(year))
+
+        logging.info(f"Loaded {len(self.team_ids)} teams and existing seasons for {len(self.known_seasons)} players.")
+
+    def player_page_request(self, response, player_name, player_url, team_id, year):
+        """
+        Request for a roster player's page, or None if the player's season for this roster year
+        is already in the DB (the player row exists too then), so the page would add nothing new.
+        """
+        player_page_url = response.urljoin(player_url)
+        if year in self.known_seasons.get(extract_sr_id(player_page_url), ()):
+            self.crawler.stats.inc_value("cfb_player_spider/known_player_skipped")
+            return None
+
+        # Go to the player page to fetch more detailed info
+        return scrapy.Request(player_page_url, callback=self.parse_player_page, meta={
+            'player_name': player_name,
+            'team_id': team_id,
+            'year': year
+        })
+
     def start_requests(self):
+        self.load_lookups()
+
         # Fetch all schools from the database
         self.db_util.cursor.execute("SELECT team_id, team_name, sr_name FROM team WHERE is_nfl = FALSE")
         schools = self.db_util.cursor.fetchall()
@@ -57,14 +98,9 @@ class CollegePlayerSpider(scrapy.Spider):
                     player_name = row.xpath('.//td[@data-stat="name_display"]/a/text()').get()
                     player_url = row.xpath('.//td[@data-stat="name_display"]/a/@href').get()
                     if player_url:
-                        player_page_url = response.urljoin(player_url)
-                        # logging.info(f"Player URL: {player_page_url}")
-                        # Go to the player page to fetch more detailed info
-                        yield scrapy.Request(player_page_url, callback=self.parse_player_page, meta={
-                            'player_name': player_name,                                
-                            'team_id': team_id,
-                            'year': year
-                            })
+                        request = self.player_page_request(response, player_name, player_url, team_id, year)
+                        if request:
+                            yield request
             else:
                 logging.info("Table not found in normal HTML. Searching in comments...")
 
@@ -95,14 +131,9 @@ class CollegePlayerSpider(scrapy.Spider):
                         # logging.info(f"Player Name: {player_name}")
 
                         if player_url:
-                            player_page_url = response.urljoin(player_url)
-                            # logging.info(f"Player URL: {player_page_url}")
-                            # Go to the player page to fetch more detailed info
-                            yield scrapy.Request(player_page_url, callback=self.parse_player_page, meta={
-                                'player_name': player_name,
-                                'team_id': team_id,
-                                'year': year
-                            })
+                            request = self.player_page_request(response, player_name, player_url, team_id, year)
+                            if request:
+                                yield request
 
                 else:
                     logging.info("Table not found inside comments.")
@@ -134,58 +165,30 @@ class CollegePlayerSpider(scrapy.Spider):
             # Using this string helps us maintain unique rows for all players in the DB
             player_url_id = extract_sr_id(response.url)
 
-            # Check if the player already exists in the database using the name and url_id
-            self.db_util.cursor.execute("""
-                SELECT player_id FROM player WHERE name = %s AND sr_id = %s
-            """, (player_name, player_url_id))
-    
-            player_row = self.db_util.cursor.fetchone()
-
-            if not player_row:
-                # Add a new row for the player
-                # Try to get their height and weight
-                height_text = response.xpath('//div[@id="info"]//p/span[contains(text(), "-")]/text()').get()  # Text like "5-9"
-                weight_text = response.xpath('//div[@id="info"]//p/span[contains(text(), "lb")]/text()').get()  # Text like "195lb"
-
-                # Convert height to inches
-                if height_text:
-                    feet, inches = map(int, height_text.split('-'))
-                    height_in_inches = feet * 12 + inches
-                else:
-                    height_in_inches = None
-
-                # Convert weight to an integer by removing "lb" and stripping whitespace
-                if weight_text:
-                    weight = int(weight_text.replace('lb', '').strip())
-                else:
-                    weight = None
+            # Try to get their height and weight
+            height_text = response.xpath('//div[@id="info"]//p/span[contains(text(), "-")]/text()').get()  # Text like "5-9"
+            weight_text = response.xpath('//div[@id="info"]//p/span[contains(text(), "lb")]/text()').get()  # Text like "195lb"
 
-                # Insert player into player table
-                self.db_util.cursor.execute("""
-                    INSERT INTO player (name, position, height, weight, sr_id)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (player_name, player_position, height_in_inches, weight, player_url_id))
-
-                # Commit and get the newly inserted player ID
-                self.db_util.conn.commit()
-                player_id = self.db_util.cursor.lastrowid
-
-                logging.info(f"Added {player_name} - {player_position} - {height_in_inches} - {weight} to player table")
-            else:
-                player_id = player_row[0]  # Retrieve existing player ID
-                logging.info(f"{player_name} already exists in the DB. Not adding a duplicate row.")
+            # The pipeline adds the player if they are new (existing players keep their values)
+            yield PlayerItem(
+                sr_id=player_url_id,
+                name=player_name,
+                position=player_position,
+                height=convert_height(height_text),
+                weight=convert_weight(weight_text)
+            )
 
             # Parse the player's year stats
-            logging.info(f"parsing stats for {player_name} - {player_id} - {team_id} - {year}")
-            self.parse_player_stats(response, player_id, team_id)
+            logging.info(f"parsing stats for {player_name} - {player_url_id} - {team_id} - {year}")
+            yield from self.parse_player_stats(response, player_url_id)
 
-    def parse_player_stats(self, response, player_id, team_id):
+    def parse_player_stats(self, response, sr_id):
         # Find the table that contains the player's stats (either receiving or rushing)
         table = response.xpath('//table[contains(@class, "stats_table") and (contains(@id, "receiving") or contains(@id, "rushing"))]')
         
         # Check if the table exists
         if not table:
-            logging.info(f"No stats table found for player_id: {player_id}")
+            logging.info(f"No stats table found for player: {sr_id}")
             return
 
         # Iterate over all rows in the stats table
@@ -197,59 +200,37 @@ class CollegePlayerSpider(scrapy.Spider):
             if not row_year:
                 continue  # Skip rows without a year
 
+            # Skip stats that already exist (or were already yielded) for the player/year combo
+            if int(row_year) in self.known_seasons[sr_id]:
+                continue
+
             # Extract team name from the row
             team_name = row.xpath('.//td[@data-stat="team_name_abbr"]/a/text()').get(default='')
 
-            # Fetch team ID based on team name (handle transfers)
-            self.db_util.cursor.execute("""
-                SELECT team_id FROM team WHERE team_name = %s
-            """, (team_name,))
-            team_row = self.db_util.cursor.fetchone()
-            if not team_row:
-                logging.info(f"Team {team_name} not found in DB for player_id: {player_id}, year: {row_year}")
+            # Look up the team ID based on team name (handle transfers)
+            row_team_id = self.team_ids.get(team_name.casefold())
+            if not row_team_id:
+                logging.info(f"Team {team_name} not found in DB for player: {sr_id}, year: {row_year}")
                 continue
 
-            row_team_id = team_row[0]
+            self.known_seasons[sr_id].add(int(row_year))
 
             # Extract stats for each year
             # Using normalize-space to get text, whether it's in a <strong> or not
-            player_class = row.xpath('normalize-space(.//td[@data-stat="class"])').get(default='')
-            games_played = row.xpath('normalize-space(.//td[@data-stat="games"])').get(default=0)
-            receptions = row.xpath('normalize-space(.//td[@data-stat="rec"])').get(default=0)
-            rec_yds = row.xpath('normalize-space(.//td[@data-stat="rec_yds"])').get(default=0)
-            rec_td = row.xpath('normalize-space(.//td[@data-stat="rec_td"])').get(default=0)
-            rush_att = row.xpath('normalize-space(.//td[@data-stat="rush_att"])').get(default=0)
-            rush_yds = row.xpath('normalize-space(.//td[@data-stat="rush_yds"])').get(default=0)
-            rush_td = row.xpath('normalize-space(.//td[@data-stat="rush_td"])').get(default=0)
-
-            # Check if stats already exist for player/year combo
-            self.db_util.cursor.execute("""
-                SELECT COUNT(*) FROM cfb_player_year_stats WHERE player_id = %s AND year = %s
-            """, (player_id, row_year))
-
-            if self.db_util.cursor.fetchone()[0] == 0:
-                # Insert into college player_year_stats table
-                self.db_util.cursor.execute("""
-                    INSERT INTO cfb_player_year_stats (
-                        player_id, team_id, year, class, games_played, rec_yds, receptions, 
-                        rush_yds, rush_att, rush_td, rec_td
-                    )
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (player_id, row_team_id, row_year, player_class, games_played, rec_yds, receptions, rush_yds, rush_att, rush_td, rec_td))
-
-                # Commit the transaction after inserting the stats
-                self.db_util.conn.commit()
-
-                # Log the successful insertion
-                logging.info(f"Successfully added stats for player_id: {player_id}, year: {row_year}, team_id: {row_team_id}, "
-                            f"class: {player_class}, games: {games_played}, receptions: {receptions}, receiving yards: {rec_yds}, "
-                            f"rushing yards: {rush_yds}, rush attempts: {rush_att}, rushing touchdowns: {rush_td}, "
-                            f"receiving touchdowns: {rec_td}")
-
-
-
-
+            yield CfbSeasonItem(
+                sr_id=sr_id,
+                team_id=row_team_id,
+                year=row_year,
+                player_class=row.xpath('normalize-space(.//td[@data-stat="class"])').get(default=''),
+                games_played=row.xpath('normalize-space(.//td[@data-stat="games"])').get(default=0),
+                receptions=row.xpath('normalize-space(.//td[@data-stat="rec"])').get(default=0),
+                rec_yds=row.xpath('normalize-space(.//td[@data-stat="rec_yds"])').get(default=0),
+                rec_td=row.xpath('normalize-space(.//td[@data-stat="rec_td"])').get(default=0),
+                rush_att=row.xpath('normalize-space(.//td[@data-stat="rush_att"])').get(default=0),
+                rush_yds=row.xpath('normalize-space(.//td[@data-stat="rush_yds"])').get(default=0),
+                rush_td=row.xpath('normalize-space(.//td[@data-stat="rush_td"])').get(default=0)
+            )
 
     def closed(self, reason):
-        # Close the database connection when the spider finishes
+        # Close the database connection when the spider finishes (items are written by the pipeline)
         self.db_util.close_connection()
@@ -1,30 +1,19 @@
 import scrapy
 import logging
-from ..util.db_util import DatabaseUtility
 from ..util.crawler_util import *
+from .items import DraftItem
 from urllib.parse import quote_plus
 import re
 from datetime import datetime
 
-class DraftSpider(scrapy.Spider):
+class DraftSpider(CrawlProfileMixin, scrapy.Spider):
     name = 'draft_spider'
     custom_settings = get_custom_settings()
 
     # Define the years to iterate over
     years = list(range(2025, 2025 + 1))
 
-    def __init__(self, *args, **kwargs):
-        super(DraftSpider, self).__init__(*args, **kwargs)
-        # Initialize the database connection using the utility class
-        self.db_util = DatabaseUtility(dictionary=True)
-
     def start_requests(self):
-        # Fetch all schools from the database
-        self.db_util.cursor.execute("SELECT team_id, team_name, sr_name FROM team")
-        schools = self.db_util.cursor.fetchall()
-
-        logging.info(f"Number of schools fetched: {len(schools)}")
-
         for year in self.years:
 
             url = f"https://www.pro-football-reference.com/years/{year}/draft.htm"
@@ -69,31 +58,7 @@ class DraftSpider(scrapy.Spider):
         if college_link:
             sr_id = re.search(r'/cfb/players/([a-zA-Z0-9-]+)\.html$', college_link).group(1)
 
-            # Search for the player in the database by name and SR ID
-            self.db_util.cursor.execute("""
-                SELECT * FROM player WHERE sr_id = %s
-            """, (sr_id,))
-            player_row = self.db_util.cursor.fetchone()
-
-            if not player_row:
-                logging.info(f"Player {player_name} with SR ID {sr_id} not found in the DB. Adding new player.")
-                self.db_util.cursor.execute("""
-                    INSERT INTO player (name, sr_id)
-                    VALUES (%s, %s)
-                """, (player_name, sr_id))
-                self.db_util.conn.commit()  # Commit to save changes
-
-                # Retrieve the newly added player row
-                self.db_util.cursor.execute("""
-                    SELECT * FROM player WHERE sr_id = %s
-                """, (sr_id,))
-                player_row = self.db_util.cursor.fetchone()
-
-            # Set draft_cap, height, weight, and birthday fields if not already present
-            player_id = player_row['player_id']
-            height_val = None
-            weight_val = None
-            birthday = None
+            # Set draft_cap, height, weight, and birthday fields
             height_text = response.xpath('//div[@id="info"]//p/span[contains(text(), "-")]/text()').get()
             height_val = convert_height(height_text) if height_text else None
 
@@ -103,17 +68,13 @@ class DraftSpider(scrapy.Spider):
             birthdate_text = response.xpath('//span[@id="necro-birth"]/@data-birth').get()
             birthday = convert_date(birthdate_text, datetime) if birthdate_text else None
 
-            update_player(self, 
-                          player_id=player_id, 
-                          draft_pick=draft_pick, 
-                          birthday=birthday,
-                          height=height_val,
-                          weight=weight_val,
-                          draft_year=draft_year
-                         )
-            
-    def closed(self, reason):
-    # Close the database connection when the spider finishes
-        self.db_util.close_connection()
-
-        
\ No newline at end of file
+            # The pipeline adds the player if they are not in the DB yet and only overwrites non-empty values
+            yield DraftItem(
+                sr_id=sr_id,
+                name=player_name,
+                draft_cap=draft_pick,
+                draft_year=draft_year,
+                height=height_val,
+                weight=weight_val,
+                birthday=birthday
+            )
@@ -2,11 +2,63 @@
 #
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/items.html
+#
+# Spiders yield these instead of writing to MySQL, and crawler.pipelines.BatchUpsertPipeline
+# writes them in batches. Players are keyed by sr_id (the sports-reference player id, e.g. 'aj-brown-3'),
+# so season items can be yielded before the player row exists in the DB.
 
 import scrapy
 
 
-class CrawlerItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+class PlayerItem(scrapy.Item):
+    # Player found on a college player page. Never overwrites values already in the DB.
+    sr_id = scrapy.Field()
+    name = scrapy.Field()
+    position = scrapy.Field()
+    height = scrapy.Field()
+    weight = scrapy.Field()
+
+
+class DraftItem(scrapy.Item):
+    # Drafted player from a pro-football-reference page. Overwrites values with any non-empty scraped value.
+    sr_id = scrapy.Field()
+    name = scrapy.Field()
+    draft_cap = scrapy.Field()
+    draft_year = scrapy.Field()
+    height = scrapy.Field()
+    weight = scrapy.Field()
+    birthday = scrapy.Field()
+
+
+class CfbSeasonItem(scrapy.Item):
+    sr_id = scrapy.Field()
+    team_id = scrapy.Field()
+    year = scrapy.Field()
+    player_class = scrapy.Field()
+    games_played = scrapy.Field()
+    rec_yds = scrapy.Field()
+    receptions = scrapy.Field()
+    rush_yds = scrapy.Field()
+    rush_att = scrapy.Field()
+    rush_td = scrapy.Field()
+    rec_td = scrapy.Field()
+
+
+class NflSeasonItem(scrapy.Item):
+    sr_id = scrapy.Field()
+    team_id = scrapy.Field()
+    year = scrapy.Field()
+    games_played = scrapy.Field()
+    rec_yds = scrapy.Field()
+    receptions = scrapy.Field()
+    rush_yds = scrapy.Field()
+    rush_att = scrapy.Field()
+    rush_td = scrapy.Field()
+    rec_td = scrapy.Field()
+
+
+class TeamYearItem(scrapy.Item):
+    team_id = scrapy.Field()
+    year = scrapy.Field()
+    team_sos = scrapy.Field()
+    team_srs = scrapy.Field()
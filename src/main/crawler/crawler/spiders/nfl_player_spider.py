@@ -2,10 +2,24 @@ import os
 import logging
 import scrapy
 import csv
+import json
+from scrapy.utils.project import data_path
 from ..util.db_util import DatabaseUtility
 from ..util.crawler_util import *
-
-class NFLPlayerSpider(scrapy.Spider):
+from .items import NflSeasonItem
+
+# Team page column (data-stat) for each NFL season field
+NFL_STAT_COLUMNS = {
+    'games_played': 'games',
+    'rec_yds': 'rec_yds',
+    'receptions': 'rec',
+    'rush_yds': 'rush_yds',
+    'rush_att': 'rush_att',
+    'rush_td': 'rush_td',
+    'rec_td': 'rec_td',
+}
+
+class NFLPlayerSpider(CrawlProfileMixin, scrapy.Spider):
     name = "nfl_player_spider"
     custom_settings = get_custom_settings()
 
@@ -30,7 +44,33 @@ class NFLPlayerSpider(scrapy.Spider):
         )
         self.missing_players = []
 
+        # pro-football-reference player URL -> sr_id, kept across runs (in the project's .scrapy/ data dir)
+        # so known players never need their profile fetched again. Only resolved sr_ids are saved.
+        self.sr_id_map_file = data_path("pfr_sr_id_map.json", createdir=True)
+        self.sr_id_map = {}
+
+        # Player URLs without a College Stats link this run; not saved, so they are checked again next run
+        self.unresolved_urls = set()
+
+        # Team page rows waiting for their player's profile to resolve the sr_id, keyed by player URL
+        self.pending_seasons = {}
+
+        self.known_sr_ids = set()
+
+    def load_lookups(self):
+        if os.path.exists(self.sr_id_map_file):
+            with open(self.sr_id_map_file, mode="r", encoding="utf-8") as file:
+                # Older maps also stored misses as null
+                self.sr_id_map = {url: sr_id for url, sr_id in json.load(file).items() if sr_id}
+
+        self.db_util.cursor.execute("SELECT sr_id FROM player WHERE sr_id IS NOT NULL")
+        self.known_sr_ids = {sr_id for (sr_id,) in self.db_util.cursor.fetchall()}
+
+        logging.info(f"Loaded {len(self.sr_id_map)} known player URLs and {len(self.known_sr_ids)} players.")
+
     def start_requests(self):
+        self.load_lookups()
+
         # Get all NFL teams from the database
         self.db_util.cursor.execute("SELECT team_id, sr_name FROM team WHERE is_nfl = TRUE")
         teams = self.db_util.cursor.fetchall()
@@ -65,16 +105,28 @@ class NFLPlayerSpider(scrapy.Spider):
                     continue
 
                 player_page_url = response.urljoin(player_url)
+                stats = {
+                    field: row.xpath(f'string(./td[@data-stat="{column}"])').get()
+                    for field, column in NFL_STAT_COLUMNS.items()
+                }
+                season = (team_id, year, stats)
+
+                # Known player URL: no profile fetch needed
+                if player_page_url in self.sr_id_map or player_page_url in self.unresolved_urls:
+                    yield from self.build_nfl_seasons(self.sr_id_map.get(player_page_url), player_page_url, [season])
+                    continue
+
+                # The profile is fetched once per crawl; later rows for the same player wait for it
+                if player_page_url in self.pending_seasons:
+                    self.pending_seasons[player_page_url].append(season)
+                    continue
+
+                self.pending_seasons[player_page_url] = [season]
                 yield scrapy.Request(
                     player_page_url,
                     callback=self.verify_player,
-                    meta={
-                        'player_name': player_name,
-                        'team_id': team_id,
-                        'year': year,
-                        'row_data': row.extract(),  # Include raw row data for processing later
-                    },
-                    dont_filter=True,  # Bypass deduplication
+                    errback=self.player_page_failed,
+                    meta={'player_name': player_name, 'player_page_url': player_page_url},
                 )
             
             else:
@@ -82,87 +134,48 @@ class NFLPlayerSpider(scrapy.Spider):
 
     def verify_player(self, response):
         """
-        Verify if the player exists in the player table using the College Stats link.
+        Resolve the player's sr_id from the College Stats link and emit every season waiting on it.
         """
-        player_name = response.meta['player_name']
-        team_id = response.meta['team_id']
-        year = response.meta['year']
-        row_data = response.meta['row_data']
+        player_page_url = response.meta['player_page_url']
+        seasons = self.pending_seasons.pop(player_page_url, [])
 
         # Extract College Stats link
         college_link = response.xpath('//a[contains(text(), "College Stats")]/@href').get()
-        if not college_link:
-            logging.warning(f"College Stats link not found for {response.url}")
-            return
+        sr_id = extract_sr_id(college_link) if college_link else None  # Extract the sr_id from the College Stats link
+        if sr_id:
+            self.sr_id_map[player_page_url] = sr_id
+        else:
+            self.unresolved_urls.add(player_page_url)
+
+        yield from self.build_nfl_seasons(sr_id, player_page_url, seasons)
+
+    def player_page_failed(self, failure):
+        seasons = self.pending_seasons.pop(failure.request.meta['player_page_url'], [])
+        logging.error(f"Could not fetch {failure.request.url}, dropping {len(seasons)} seasons: {failure.getErrorMessage()}")
 
-        sr_id = extract_sr_id(college_link)  # Extract the sr_id from the College Stats link
+    def build_nfl_seasons(self, sr_id, player_page_url, seasons):
+        """
+        Build the NFL season items of a player whose sr_id is resolved.
+        """
+        if not sr_id:
+            logging.warning(f"College Stats link not found for {player_page_url}")
+            return
 
         # Check if the player exists in the database
-        self.db_util.cursor.execute("SELECT player_id FROM player WHERE sr_id = %s", (sr_id,))
-        result = self.db_util.cursor.fetchone()
-        if not result:
+        if sr_id not in self.known_sr_ids:
             logging.warning(f"Player with sr_id {sr_id} not found in DB. Adding to missing players log.")
-            self.missing_players.append({
-                'year': year,
-                'team_id': team_id,
-                'sr_id': sr_id,
-                'college_link': college_link,
-            })
+            for team_id, year, _ in seasons:
+                self.missing_players.append({
+                    'year': year,
+                    'team_id': team_id,
+                    'sr_id': sr_id,
+                    'college_link': f"https://www.sports-reference.com/cfb/players/{sr_id}.html",
+                })
             return
 
-        player_id = result[0]
-        logging.info(f"Player {player_id} found in DB. Saving stats...")
-
         # Save the player's NFL stats
-        self.save_nfl_stats(player_id, team_id, year, row_data)
-
-    def save_nfl_stats(self, player_id, team_id, year, row_data):
-        """
-        Save NFL stats for a player.
-        """
-        try:
-            # Extract stats from the row data
-            row_selector = scrapy.Selector(text=row_data)
-            stats = {
-                'games_played': row_selector.xpath('string(.//td[@data-stat="games"])').get(),
-                'rec_yds': row_selector.xpath('string(.//td[@data-stat="rec_yds"])').get(),
-                'rec': row_selector.xpath('string(.//td[@data-stat="rec"])').get(),
-                'rush_yds': row_selector.xpath('string(.//td[@data-stat="rush_yds"])').get(),
-                'rush_att': row_selector.xpath('string(.//td[@data-stat="rush_att"])').get(),
-                'rush_td': row_selector.xpath('string(.//td[@data-stat="rush_td"])').get(),
-                'rec_td': row_selector.xpath('string(.//td[@data-stat="rec_td"])').get(),
-            }
-
-            # Check if stats already exist for this player, team, and year
-            self.db_util.cursor.execute("""
-                SELECT COUNT(*)
-                FROM nfl_player_year_stats
-                WHERE player_id = %s AND team_id = %s AND year = %s
-            """, (player_id, team_id, year))
-
-            if self.db_util.cursor.fetchone()[0] == 0:
-                # Insert the stats into the NFL player year stats table
-                self.db_util.cursor.execute("""
-                    INSERT INTO nfl_player_year_stats (
-                        player_id, team_id, year, games_played, rec_yds, receptions, rush_yds, rush_att, rush_td, rec_td
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """, (
-                    player_id, team_id, year,
-                    stats['games_played'],
-                    stats['rec_yds'],
-                    stats['rec'], 
-                    stats['rush_yds'],
-                    stats['rush_att'],  
-                    stats['rush_td'],
-                    stats['rec_td']
-                ))
-                self.db_util.conn.commit()
-                logging.info(f"Saved NFL stats for player_id {player_id}, team_id {team_id}, year {year}.")
-            else:
-                logging.info(f"Stats for player_id {player_id}, team_id {team_id}, year {year} already exist. Skipping.")
-
-        except Exception as e:
-            logging.error(f"Error saving stats for player {player_id}, team {team_id}, year {year}: {e}")
+        for team_id, year, stats in seasons:
+            yield NflSeasonItem(sr_id=sr_id, team_id=team_id, year=year, **stats)
 
     def closed(self, reason):
         # Write missing players to a CSV file
@@ -173,6 +186,10 @@ class NFLPlayerSpider(scrapy.Spider):
                 writer.writeheader()
                 writer.writerows(self.missing_players)
 
+        # Save the player URL -> sr_id map for the next run
+        with open(self.sr_id_map_file, mode="w", encoding="utf-8") as file:
+            json.dump(self.sr_id_map, file, indent=1, sort_keys=True)
+
         # Close database connection
         self.db_util.cursor.close()
         self.db_util.conn.close()
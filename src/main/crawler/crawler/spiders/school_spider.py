@@ -2,9 +2,9 @@ import os
 import scrapy
 import mysql.connector
 from ..util.db_util import DatabaseUtility
-from ..util.crawler_util import get_custom_settings
+from ..util.crawler_util import get_custom_settings, CrawlProfileMixin
 
-class SchoolSpider(scrapy.Spider):
+class SchoolSpider(CrawlProfileMixin, scrapy.Spider):
     name = 'school_spider'
     start_urls = ['https://www.sports-reference.com/cfb/schools/']
 
@@ -2,16 +2,35 @@ import scrapy
 import logging
 from ..util.db_util import DatabaseUtility
 from urllib.parse import quote_plus
-from ..util.crawler_util import get_custom_settings
+from ..util.crawler_util import get_custom_settings, CrawlProfileMixin
+from .items import TeamYearItem
 from scrapy_playwright.page import PageMethod
 
-class SchoolYearStatsSpider(scrapy.Spider):
+# Headers sent with both the plain HTTP and the Playwright requests
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.google.com/',
+    'Connection': 'keep-alive'
+}
+
+class SchoolYearStatsSpider(CrawlProfileMixin, scrapy.Spider):
     name = "school_year_stats_spider"
 
     # Add LOG_LEVEL to custom settings
+    # SOS/SRS are in the static HTML, so pages are fetched over plain HTTP and the browser is only
+    # started if a page has to be rendered. The fallback runs headless in one shared browser context.
     custom_settings = {
         **get_custom_settings(),
-        'LOG_LEVEL': 'INFO'
+        'LOG_LEVEL': 'INFO',
+        'PLAYWRIGHT_LAUNCH_OPTIONS': {
+            **get_custom_settings()['PLAYWRIGHT_LAUNCH_OPTIONS'],
+            'headless': True,
+        },
+        'PLAYWRIGHT_MAX_CONTEXTS': 1,
+        'PLAYWRIGHT_MAX_PAGES_PER_CONTEXT': 4,
     }
 
     start_year = 2024
@@ -31,35 +50,39 @@ class SchoolYearStatsSpider(scrapy.Spider):
                 url = f"https://www.sports-reference.com/cfb/schools/{quote_plus(sr_name)}/{year}.html"
                 logging.info(f"Processing URL: {url}")
 
+                # Requests without the 'playwright' meta key go through Scrapy's HTTP handler
                 yield scrapy.Request(
                     url,
                     callback=self.parse_school_page,
-                    meta={
-                        'team_id': team_id,
-                        'year': year,
-                        'playwright': True,
-                        'playwright_page_methods': [
-                            PageMethod(
-                                "route",
-                                "**/*",
-                                lambda route, request: route.abort()
-                                if request.resource_type in ["image", "media", "font", "stylesheet", "other"]
-                                else route.continue_()
-                            ),
-                            PageMethod("wait_for_selector", "#wrap"),
-                            PageMethod("wait_for_timeout", 1000)
-                        ]
-                    },
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
-                                      '(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36',
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9',
-                        'Accept-Language': 'en-US,en;q=0.9',
-                        'Referer': 'https://www.google.com/',
-                        'Connection': 'keep-alive'
-                    }
+                    meta={'team_id': team_id, 'year': year},
+                    headers=REQUEST_HEADERS
                 )
 
+    def playwright_request(self, response):
+        """ Re-request a page through the (headless, shared) browser when the static HTML had no SOS. """
+        self.crawler.stats.inc_value("school_year_stats_spider/playwright_fallback")
+        return response.request.replace(
+            dont_filter=True,
+            meta={
+                **response.meta,
+                'playwright': True,
+                # Same fingerprint as the static request, so skip the page cache or it returns the unrendered page
+                'dont_cache': True,
+                # The 'default' context from PLAYWRIGHT_CONTEXTS, the only one PLAYWRIGHT_MAX_CONTEXTS allows
+                'playwright_context': 'default',
+                'playwright_page_methods': [
+                    PageMethod(
+                        "route",
+                        "**/*",
+                        lambda route, request: route.abort()
+                        if request.resource_type in ["image", "media", "font", "stylesheet", "other"]
+                        else route.continue_()
+                    ),
+                    PageMethod("wait_for_selector", "#wrap")
+                ]
+            }
+        )
+
     def parse_school_page(self, response):
         valid_page = not response.xpath('//div[@id="content"]//h1[text()="Page Not Found (404 error)"]').get()
         if not valid_page:
@@ -72,38 +95,18 @@ class SchoolYearStatsSpider(scrapy.Spider):
         team_srs = response.xpath('//p/a/strong[text()="SRS"]/parent::a/parent::p/text()').re_first(r':\s([-+]?\d*\.?\d+)')
 
         if team_sos is None:
+            if not response.meta.get('playwright'):
+                logging.info(f"SOS value not in static HTML for {response.url}, rendering with Playwright.")
+                yield self.playwright_request(response)
+                return
             logging.warning(f"SOS value not found for {response.url}, skipping.")
             return
         if team_srs is None:
             logging.warning(f"SRS value not found for {response.url}, skipping.")
 
-        try:
-            self.db_util.cursor.execute("""
-                SELECT COUNT(*) FROM team_year_stats WHERE team_id = %s AND year = %s
-            """, (team_id, year))
-            exists = self.db_util.cursor.fetchone()[0] > 0
-
-            if exists:
-                self.db_util.cursor.execute("""
-                    UPDATE team_year_stats SET team_sos = %s, team_srs = %s
-                    WHERE team_id = %s AND year = %s
-                """, (team_sos, team_srs, team_id, year))
-                logging.info(f"Updated team SOS/SRS for team_id {team_id} in year {year}")
-            else:
-                self.db_util.cursor.execute("""
-                    INSERT INTO team_year_stats (team_id, year, team_sos, team_srs)
-                    VALUES (%s, %s, %s, %s)
-                """, (team_id, year, team_sos, team_srs))
-                logging.info(f"Inserted new team SOS for team_id {team_id} in year {year}")
-
-            self.db_util.conn.commit()
-
-            logging.info(f"✅ Finished processing: {response.url}")
-
-        except Exception as e:
-            logging.error(f"Error saving stats for team_id {team_id} in year {year}: {e}")
-
-
+        # The pipeline inserts the team-year or updates its SOS/SRS if it already exists
+        yield TeamYearItem(team_id=team_id, year=year, team_sos=team_sos, team_srs=team_srs)
+        logging.info(f"✅ Finished processing: {response.url}")
 
     def closed(self, reason):
         self.db_util.close_connection()
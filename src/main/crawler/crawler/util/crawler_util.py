@@ -1,19 +1,92 @@
+import os
+import csv
 import logging
 import re
 import json
+import unicodedata
+from collections import defaultdict
 
-def get_custom_settings():
-    return {
+# Hosts the live spiders fetch from
+SITE_HOSTS = ["www.sports-reference.com", "www.pro-football-reference.com"]
+
+# Named crawl profiles, selected with: scrapy crawl <spider> -s CRAWL_PROFILE=<name>
+# Each spider has a default (CrawlProfileMixin.crawl_profile); any other -s setting still overrides the profile.
+# DOWNLOAD_SLOTS - concurrency/delay per host, TOKEN_BUCKET_RATES - requests per second per host
+# (see crawler/middlewares.py), RETRY_BACKOFF_* - exponential backoff between retries.
+CRAWL_PROFILES = {
+    # Day-to-day crawls: one request at a time per site, capped at the sites' rate limit (0.3 req/s).
+    # Slower than the old fixed settings, whose randomized 2s DOWNLOAD_DELAY allowed ~0.5 req/s.
+    "polite": {
+        'CONCURRENT_REQUESTS': len(SITE_HOSTS),
         'DOWNLOAD_DELAY': 2,
         'RANDOMIZE_DOWNLOAD_DELAY': True,
-        'CONCURRENT_REQUESTS': 1,
+        'DOWNLOAD_SLOTS': {host: {'concurrency': 1, 'delay': 2, 'randomize_delay': True} for host in SITE_HOSTS},
         'AUTOTHROTTLE_ENABLED': True,
         'AUTOTHROTTLE_START_DELAY': 2,
         'AUTOTHROTTLE_MAX_DELAY': 30,
         'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'TOKEN_BUCKET_RATES': {host: {'rate': 0.3, 'burst': 1} for host in SITE_HOSTS},
         'RETRY_ENABLED': True,
         'RETRY_TIMES': 3,
         'RETRY_HTTP_CODES': [429, 500, 502, 503, 504],
+        'RETRY_BACKOFF_BASE': 5,
+        'RETRY_BACKOFF_MAX': 120,
+    },
+    # Multi-year backfills: the token bucket alone paces requests at the sites' limit, with longer retries
+    "backfill": {
+        'CONCURRENT_REQUESTS': 2 * len(SITE_HOSTS),
+        'DOWNLOAD_DELAY': 0,
+        'DOWNLOAD_SLOTS': {host: {'concurrency': 2, 'delay': 0} for host in SITE_HOSTS},
+        'AUTOTHROTTLE_ENABLED': False,
+        'TOKEN_BUCKET_RATES': {host: {'rate': 0.3, 'burst': 3} for host in SITE_HOSTS},
+        'RETRY_ENABLED': True,
+        'RETRY_TIMES': 6,
+        'RETRY_HTTP_CODES': [429, 500, 502, 503, 504],
+        'RETRY_BACKOFF_BASE': 10,
+        'RETRY_BACKOFF_MAX': 600,
+    },
+    # Re-parse from the page cache only (see crawler/httpcache.py): full speed, nothing goes to the network
+    "offline-cache": {
+        'CONCURRENT_REQUESTS': 32,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 32,
+        'DOWNLOAD_DELAY': 0,
+        'DOWNLOAD_SLOTS': {},
+        'AUTOTHROTTLE_ENABLED': False,
+        'TOKEN_BUCKET_RATES': {},
+        'RETRY_ENABLED': False,
+        'HTTPCACHE_ENABLED': True,
+        'HTTPCACHE_OFFLINE': True,
+    },
+    # CSV-driven spiders (pff_spider, ras_spider) that never download anything
+    "local": {
+        'CONCURRENT_REQUESTS': 16,
+        'DOWNLOAD_DELAY': 0,
+        'DOWNLOAD_SLOTS': {},
+        'AUTOTHROTTLE_ENABLED': False,
+        'TOKEN_BUCKET_RATES': {},
+        'RETRY_ENABLED': False,
+        'ROBOTSTXT_OBEY': False,
+        'HTTPCACHE_ENABLED': False,
+    },
+}
+
+def apply_crawl_profile(settings, profile):
+    """ Applies a named crawl profile at spider priority, so -s command line settings still win. """
+    if profile not in CRAWL_PROFILES:
+        raise ValueError(f"Unknown crawl profile: {profile} (choose from {', '.join(CRAWL_PROFILES)})")
+    settings.setdict(CRAWL_PROFILES[profile], priority="spider")
+
+class CrawlProfileMixin:
+    """ Spider mixin that applies CRAWL_PROFILE (or the spider's default crawl_profile) on top of custom_settings. """
+    crawl_profile = "polite"
+
+    @classmethod
+    def update_settings(cls, settings):
+        super().update_settings(settings)
+        apply_crawl_profile(settings, settings.get("CRAWL_PROFILE") or cls.crawl_profile)
+
+def get_custom_settings():
+    return {
         'ROBOTSTXT_OBEY': True,
         'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36',
         'AUTOTHROTTLE_DEBUG': False,
@@ -147,24 +220,26 @@ def find_player_id(db_util, player_name):
         name_like = f"%{'%'.join(player_name.lower().split())}%"
         name_like_normalized = like_name(player_name, True)
 
-        # Base query to find the player
-        db_util.cursor.execute("""
+        # Base query to find the player (prepared once per connection, this runs for every scraped row)
+        cursor = db_util.prepared_cursor("find_player_id")
+        cursor.execute("""
             SELECT player_id
             FROM player
             WHERE (sr_id LIKE %s OR sr_id LIKE %s OR name = %s)
         """, (name_like, name_like_normalized, player_name))
-        results = db_util.cursor.fetchall()
+        results = cursor.fetchall()
 
         # If no direct match, check nicknames
         if not results:
             logging.info(f"No direct match found for {player_name}. Checking nicknames...")
             escaped_player_name = json.dumps(player_name)
-            db_util.cursor.execute("""
+            cursor = db_util.prepared_cursor("find_player_id_nickname")
+            cursor.execute("""
                 SELECT player_id
                 FROM player
                 WHERE JSON_CONTAINS(nicknames, %s)
             """, (escaped_player_name,))
-            results = db_util.cursor.fetchall()
+            results = cursor.fetchall()
 
         # Return the matched player_id if found
         return results[0][0] if results else None
@@ -189,7 +264,8 @@ def find_player_year_id(db_util, player_name, franchise_id, year, table_name):
         name_like_normalized = like_name(player_name, True)
 
         # Base query to find the player-year mapping
-        db_util.cursor.execute(f"""
+        cursor = db_util.prepared_cursor(f"find_player_year_id_{table_name}")
+        cursor.execute(f"""
             SELECT c.player_year_id
             FROM {table_name} c
             JOIN player p ON c.player_id = p.player_id
@@ -197,13 +273,14 @@ def find_player_year_id(db_util, player_name, franchise_id, year, table_name):
             WHERE (p.sr_id LIKE %s OR p.sr_id LIKE %s OR p.name = %s)
               AND t.pff_id = %s AND c.year = %s
         """, (name_like, name_like_normalized, player_name, franchise_id, year))
-        results = db_util.cursor.fetchall()
+        results = cursor.fetchall()
 
         # If no direct match, check nicknames
         if not results:
             logging.info(f"No direct match found for {player_name}. Checking nicknames...")
             escaped_player_name = json.dumps(player_name)
-            db_util.cursor.execute(f"""
+            cursor = db_util.prepared_cursor(f"find_player_year_id_{table_name}_nickname")
+            cursor.execute(f"""
                 SELECT c.player_year_id
                 FROM {table_name} c
                 JOIN player p ON c.player_id = p.player_id
@@ -211,7 +288,7 @@ def find_player_year_id(db_util, player_name, franchise_id, year, table_name):
                 WHERE JSON_CONTAINS(p.nicknames, %s)
                   AND t.pff_id = %s AND c.year = %s
             """, (escaped_player_name, franchise_id, year))
-            results = db_util.cursor.fetchall()
+            results = cursor.fetchall()
 
         # Return the matched player_year_id if found
         return results[0][0] if results else None
@@ -219,7 +296,157 @@ def find_player_year_id(db_util, player_name, franchise_id, year, table_name):
         logging.error(f"Error finding player_year_id for {player_name} in year {year}: {e}")
         return None
 
-    
+
+
+def fold_name(text):
+    """
+    Case- and accent-insensitive form of a string, matching how MySQL's default
+    utf8mb4 collation compares names in LIKE and = (e.g. "Hernández" == "hernandez").
+    """
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in text if not unicodedata.combining(char)).casefold()
+
+def like_to_regex(pattern):
+    """ Compiles a SQL LIKE pattern ('%' = any run of characters, '_' = any one character) to a regex for fullmatch. """
+    return re.compile("".join(
+        ".*" if char == "%" else "." if char == "_" else re.escape(char) for char in pattern
+    ), re.DOTALL)
+
+
+class PlayerNameIndex:
+    """
+    In-memory replacement for find_player_id / find_player_year_id, built once per run.
+    Resolves names with the same rules as the SQL lookups: sr_id LIKE '%first%last%',
+    sr_id LIKE like_name(name, True), name = name, then the nicknames fallback.
+    Where the SQL could match several players, the lowest id is returned.
+    """
+    NGRAM_SIZE = 3
+
+    def __init__(self, db_util):
+        self.db_util = db_util
+        self.sr_ids = {}                        # player_id -> folded sr_id
+        self.sr_id_ngrams = defaultdict(set)    # 3-gram of an sr_id -> player_ids
+        self.names = defaultdict(set)           # folded name -> player_ids
+        self.nicknames = defaultdict(set)       # nickname (exact, like JSON_CONTAINS) -> player_ids
+        self.player_years = {}                  # table_name -> {(pff_id, year): [(player_year_id, player_id)]}
+        self.load_players()
+
+    def load_players(self):
+        # Plain tuple cursor so the index works whatever mode db_util.cursor is in
+        cursor = self.db_util.conn.cursor()
+        cursor.execute("SELECT player_id, name, sr_id, nicknames FROM player")
+        rows = cursor.fetchall()
+        cursor.close()
+
+        for player_id, name, sr_id, nicknames in rows:
+            if sr_id:
+                folded_sr_id = fold_name(sr_id)
+                self.sr_ids[player_id] = folded_sr_id
+                for start in range(len(folded_sr_id) - self.NGRAM_SIZE + 1):
+                    self.sr_id_ngrams[folded_sr_id[start:start + self.NGRAM_SIZE]].add(player_id)
+            if name:
+                self.names[fold_name(name)].add(player_id)
+            if nicknames:
+                if isinstance(nicknames, (bytes, bytearray)):
+                    nicknames = nicknames.decode("utf-8")
+                nicknames = json.loads(nicknames) if isinstance(nicknames, str) else nicknames
+                for nickname in nicknames if isinstance(nicknames, list) else [nicknames]:
+                    if isinstance(nickname, str):
+                        self.nicknames[nickname].add(player_id)
+
+        logging.info(f"✅ Indexed {len(rows)} players for name lookups.")
+
+    def load_player_years(self, table_name):
+        """ Loads the (team pff_id, year) -> player-year rows of a stats table once per table. """
+        if table_name not in self.player_years:
+            cursor = self.db_util.conn.cursor()
+            cursor.execute(f"""
+                SELECT c.player_year_id, c.player_id, t.pff_id, c.year
+                FROM {table_name} c
+                JOIN team t ON c.team_id = t.team_id
+            """)
+            player_years = defaultdict(list)
+            for player_year_id, player_id, pff_id, year in cursor.fetchall():
+                player_years[(str(pff_id), int(year))].append((player_year_id, player_id))
+            cursor.close()
+
+            self.player_years[table_name] = player_years
+            logging.info(f"✅ Indexed {sum(len(rows) for rows in player_years.values())} rows of {table_name}.")
+        return self.player_years[table_name]
+
+    def match_sr_id(self, pattern):
+        """ Player ids whose sr_id matches a LIKE pattern, checking only sr_ids that share its longest literal part. """
+        pattern = fold_name(pattern)
+        regex = like_to_regex(pattern)
+        literal = max(re.split(r"[%_]", pattern), key=len)
+
+        if len(literal) >= self.NGRAM_SIZE:
+            candidates = set.intersection(*(
+                self.sr_id_ngrams.get(literal[start:start + self.NGRAM_SIZE], set())
+                for start in range(len(literal) - self.NGRAM_SIZE + 1)
+            ))
+        else:
+            candidates = self.sr_ids.keys()
+
+        return {player_id for player_id in candidates if regex.fullmatch(self.sr_ids[player_id])}
+
+    def match_player_ids(self, player_name):
+        """ All player ids the direct (non-nickname) SQL lookup would match. """
+        if not player_name:
+            return set()
+
+        name_like = f"%{'%'.join(player_name.lower().split())}%"
+        name_like_normalized = like_name(player_name, True)
+        return (self.match_sr_id(name_like)
+                | self.match_sr_id(name_like_normalized)
+                | self.names.get(fold_name(player_name), set()))
+
+    def find_player_id(self, player_name):
+        """
+        Find a player's ID by their name or nicknames.
+        :param player_name: Name of the player.
+        :return: Matched `player_id` or None if not found.
+        """
+        player_ids = self.match_player_ids(player_name)
+
+        if not player_ids and player_name:
+            logging.info(f"No direct match found for {player_name}. Checking nicknames...")
+            player_ids = self.nicknames.get(player_name, set())
+
+        return min(player_ids) if player_ids else None
+
+    def find_player_year_id(self, player_name, franchise_id, year, table_name):
+        """
+        Find a `player_year_id` for a specific year and team in the stats table.
+        :param player_name: Name of the player.
+        :param franchise_id: Team franchise (PFF) ID.
+        :param year: Year for filtering.
+        :param table_name: Table name to search for the player-year mapping.
+        :return: Matched `player_year_id` or None if not found.
+        """
+        team_rows = self.load_player_years(table_name).get((str(franchise_id), int(year)), [])
+        player_ids = self.match_player_ids(player_name)
+        matches = [player_year_id for player_year_id, player_id in team_rows if player_id in player_ids]
+
+        if not matches and player_name:
+            logging.info(f"No direct match found for {player_name}. Checking nicknames...")
+            player_ids = self.nicknames.get(player_name, set())
+            matches = [player_year_id for player_year_id, player_id in team_rows if player_id in player_ids]
+
+        return min(matches) if matches else None
+
+
 def extract_sr_id(sr_url):
     return re.search(r'/cfb/players/([a-zA-Z0-9-]+)\.html$', sr_url).group(1)
 
+def write_missing_players(file_path, missing_players, fieldnames):
+    """ Writes the players a load could not match to a CSV file (nothing is written if all matched). """
+    if not missing_players:
+        return
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    logging.info(f"Writing missing players to {file_path}")
+    with open(file_path, mode="w", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(missing_players)
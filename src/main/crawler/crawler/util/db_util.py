@@ -1,16 +1,135 @@
 import os
 import mysql.connector
+from mysql.connector import pooling
 
-class DatabaseUtility:
-    def __init__(self, dictionary=False):
-        self.conn = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_NAME')
+# Connection pools shared by every DatabaseUtility in this process, keyed by pool name
+_pools = {}
+
+def _connection_config():
+    return {
+        "host": os.getenv('DB_HOST'),
+        "user": os.getenv('DB_USER'),
+        "password": os.getenv('DB_PASSWORD'),
+        "database": os.getenv('DB_NAME')
+    }
+
+def get_connection_pool(pool_name, pool_size=5):
+    """
+    Returns the named connection pool for this process, creating it on first use.
+    Pools are not shared across processes; each worker process builds its own.
+    """
+    if pool_name not in _pools:
+        _pools[pool_name] = pooling.MySQLConnectionPool(
+            pool_name=pool_name,
+            pool_size=pool_size,
+            pool_reset_session=True,
+            **_connection_config()
         )
+    return _pools[pool_name]
+
+class DatabaseUtility:
+    def __init__(self, dictionary=False, pool_name=None, pool_size=5):
+        """
+        :param dictionary: Return rows from the shared cursor as dicts.
+        :param pool_name: Borrow a warm connection from the named pool instead of opening a new one.
+                          close_connection() hands it back to the pool.
+        :param pool_size: Size of the pool if it does not exist yet.
+        """
+        if pool_name:
+            self.conn = get_connection_pool(pool_name, pool_size).get_connection()
+        else:
+            self.conn = mysql.connector.connect(**_connection_config())
         self.cursor = self.conn.cursor(dictionary=dictionary)
+        self._prepared_cursors = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.conn.rollback()
+        self.close_connection()
+        return False
+
+    def prepared_cursor(self, name="default"):
+        """
+        Returns a server-side prepared statement cursor for hot lookups that run the same
+        query many times. The statement is parsed once and only the parameters are sent after that.
+        A cursor re-prepares whenever its query text changes, so use one name per hot query.
+        Note: prepared cursors return tuples, never dicts.
+        """
+        if name not in self._prepared_cursors:
+            self._prepared_cursors[name] = self.conn.cursor(prepared=True)
+        return self._prepared_cursors[name]
 
     def close_connection(self):
+        for cursor in self._prepared_cursors.values():
+            cursor.close()
+        self._prepared_cursors = {}
         self.cursor.close()
+        # Pooled connections are returned to their pool instead of being closed
         self.conn.close()
+
+    def bulk_update(self, table, key_column, columns, rows, coalesce=False, batch_size=1000):
+        """
+        Applies many single-row updates at once. Rows are loaded into a temporary staging table
+        with multi-row INSERTs and applied with a single UPDATE ... JOIN in one transaction.
+        :param table: Table to update (e.g. player).
+        :param key_column: Column the rows are matched on (e.g. player_id).
+        :param columns: Columns to update.
+        :param rows: Iterable of (key, value, ...) tuples with values in the same order as columns.
+        :param coalesce: Keep the current value wherever the staged value is NULL.
+        :param batch_size: Rows per multi-row INSERT into the staging table.
+        :return: Number of rows changed.
+        """
+        # When a key appears more than once the staged row must match sequential UPDATEs: later rows win,
+        # and with coalesce a later NULL keeps the value of an earlier row for the same key
+        merged = {}
+        for row in rows:
+            row = tuple(row)
+            previous = merged.get(row[0])
+            if coalesce and previous is not None:
+                row = tuple(previous[i] if value is None else value for i, value in enumerate(row))
+            merged[row[0]] = row
+        rows = list(merged.values())
+        if not rows:
+            return 0
+
+        staging_table = f"{table}_staging"
+        all_columns = [key_column, *columns]
+        placeholders = ", ".join(["%s"] * len(all_columns))
+        if coalesce:
+            set_clause = ", ".join(f"t.{column} = COALESCE(s.{column}, t.{column})" for column in columns)
+        else:
+            set_clause = ", ".join(f"t.{column} = s.{column}" for column in columns)
+
+        try:
+            # The staging table copies the column types of the target table. The key is declared here
+            # because an ALTER TABLE, even on a temporary table, commits the transaction implicitly.
+            self.cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging_table}")
+            self.cursor.execute(f"""
+                CREATE TEMPORARY TABLE {staging_table} (PRIMARY KEY ({key_column}))
+                SELECT {", ".join(all_columns)} FROM {table} LIMIT 0
+            """)
+
+            # executemany rewrites INSERT ... VALUES into a single multi-row INSERT per batch
+            for start in range(0, len(rows), batch_size):
+                self.cursor.executemany(
+                    f"INSERT INTO {staging_table} ({', '.join(all_columns)}) VALUES ({placeholders})",
+                    rows[start:start + batch_size]
+                )
+
+            self.cursor.execute(f"""
+                UPDATE {table} t
+                JOIN {staging_table} s ON t.{key_column} = s.{key_column}
+                SET {set_clause}
+            """)
+            updated = self.cursor.rowcount
+
+            self.cursor.execute(f"DROP TEMPORARY TABLE {staging_table}")
+            self.conn.commit()
+            return updated
+        except Exception:
+            self.conn.rollback()
+            raise
+
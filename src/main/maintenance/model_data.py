@@ -0,0 +1,71 @@
+import logging
+import time
+
+# Source view -> materialized table, per position (tables and triggers: src/main/sql/model_data_mv.sql)
+MODEL_DATA_TABLES = {
+    "RB": ("rb_model_data", "rb_model_data_mv"),
+    "WR": ("wr_model_data", "wr_model_data_mv"),
+    "TE": ("te_model_data", "te_model_data_mv"),
+}
+
+def get_model_data_table(position):
+    """ Returns the materialized model data table to read for a position (RB, WR, TE). """
+    return MODEL_DATA_TABLES[position][1]
+
+def get_dirty_player_ids(db_util, watermark):
+    db_util.cursor.execute("""
+        SELECT player_id FROM model_data_dirty_player WHERE marked_at <= %s
+    """, (watermark,))
+    return [row[0] for row in db_util.cursor.fetchall()]
+
+def refresh_players(db_util, player_ids, chunk_size=500):
+    """
+    Recomputes the model data rows of the given players in every position's table. A player is removed
+    from all tables first, so one who changed position (or stopped qualifying) leaves the old table.
+    """
+    for start in range(0, len(player_ids), chunk_size):
+        chunk = player_ids[start:start + chunk_size]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        for view, table in MODEL_DATA_TABLES.values():
+            db_util.cursor.execute(f"DELETE FROM {table} WHERE player_id IN ({placeholders})", chunk)
+            # player_id is a grouping column of the views, so MySQL pushes the filter into the aggregation
+            db_util.cursor.execute(f"INSERT INTO {table} SELECT * FROM {view} WHERE player_id IN ({placeholders})", chunk)
+
+def refresh_all(db_util):
+    """ Rebuilds every materialized table from its view. """
+    for view, table in MODEL_DATA_TABLES.values():
+        db_util.cursor.execute(f"DELETE FROM {table}")
+        db_util.cursor.execute(f"INSERT INTO {table} SELECT * FROM {view}")
+        logging.info(f"✅ Rebuilt {table} ({db_util.cursor.rowcount} players)")
+
+def refresh_model_data(db_util, full=False):
+    """
+    Brings the *_model_data_mv tables up to date in one transaction.
+    :param full: Rebuild the tables from scratch instead of only the players marked dirty.
+    :return: Number of players refreshed (None for a full rebuild).
+    """
+    start_time = time.perf_counter()
+    db_util.cursor.execute("SELECT CURRENT_TIMESTAMP(6)")
+    watermark = db_util.cursor.fetchone()[0]
+
+    try:
+        if full:
+            refresh_all(db_util)
+            refreshed = None
+        else:
+            player_ids = get_dirty_player_ids(db_util, watermark)
+            refresh_players(db_util, player_ids)
+            refreshed = len(player_ids)
+
+        # Players marked after the watermark (e.g. by a crawl running meanwhile) stay dirty for the next refresh
+        db_util.cursor.execute("DELETE FROM model_data_dirty_player WHERE marked_at <= %s", (watermark,))
+        db_util.conn.commit()
+    except Exception:
+        db_util.conn.rollback()
+        raise
+
+    if full:
+        logging.info(f"✅ Rebuilt model data tables in {time.perf_counter() - start_time:.2f}s")
+    else:
+        logging.info(f"✅ Refreshed model data for {refreshed} players in {time.perf_counter() - start_time:.2f}s")
+    return refreshed
@@ -0,0 +1,21 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add "src" to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from main.util.db_util import DatabaseUtility
+from main.maintenance.model_data import refresh_model_data
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Refresh the materialized model data tables (*_model_data_mv).")
+    parser.add_argument("--full", action="store_true",
+                        help="Rebuild every table from its view instead of only the players whose data changed")
+    args = parser.parse_args()
+
+    with DatabaseUtility() as db_util:
+        refresh_model_data(db_util, full=args.full)
@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import xgboost as xgb
+from main.models.position_models import (MODEL_SPECS, build_model, get_training_data, get_training_fingerprint,
+                                         fit_position_model)
+
+# Layout:
+#   artifacts/registry.json       - position -> key of the model currently used for predictions
+#   artifacts/<position>/<key>.ubj  - booster in XGBoost's UBJSON format
+#   artifacts/<position>/<key>.json - metadata (features, constraints, params, training fingerprint, ...)
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "artifacts"))
+
+def get_model_config(position):
+    """ Everything besides the training data that determines a position's fitted model. """
+    params = build_model(position).get_params(deep=False)
+    params.pop("n_jobs", None)  # thread count does not change the model
+    spec = MODEL_SPECS[position]
+    return {
+        "position": position,
+        "features": spec["features"],
+        "monotone_constraints": spec["monotone_constraints"],
+        "inverse_dc_offset": spec["inverse_dc_offset"],
+        "max_boost": spec["max_boost"],
+        "params": params,
+    }
+
+def get_model_key(config, training_fingerprint):
+    """ Artifact key: changes with the position's features, constraints, params or training data. """
+    payload = json.dumps({**config, "training_fingerprint": training_fingerprint}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, mode="w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2, default=str)
+    os.replace(temp_path, path)
+
+def train_or_reuse(position, df, holdout_years, n_jobs=None, models_dir=MODELS_DIR, force=False):
+    """
+    Fits and saves a position's model unless an artifact for the same config and training data exists.
+    :return: Metadata of the model to use.
+    """
+    X_train, y_train, sample_weights = get_training_data(position, df, holdout_years)
+    config = get_model_config(position)
+    fingerprint = get_training_fingerprint(X_train, y_train, sample_weights)
+    key = get_model_key(config, fingerprint)
+
+    booster_path = os.path.join(models_dir, position.lower(), f"{key}.ubj")
+    metadata_path = os.path.join(models_dir, position.lower(), f"{key}.json")
+    if not force and os.path.exists(booster_path) and os.path.exists(metadata_path):
+        logging.info(f"✅ {position} training data unchanged, reusing model {key}")
+        with open(metadata_path, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+
+    model = fit_position_model(position, X_train, y_train, sample_weights, n_jobs)
+    os.makedirs(os.path.dirname(booster_path), exist_ok=True)
+    model.get_booster().save_model(booster_path)
+
+    metadata = {
+        **config,
+        "key": key,
+        "training_fingerprint": fingerprint,
+        "holdout_years": sorted(holdout_years),
+        "training_rows": len(X_train),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    write_json_atomic(metadata_path, metadata)
+    logging.info(f"📝 Saved {position} model {key} to {booster_path}")
+    return metadata
+
+class ModelRegistry:
+    """
+    Saved position models. Boosters are loaded lazily, once per position, the first time they are used.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR):
+        self.models_dir = models_dir
+        self.registry_path = os.path.join(models_dir, "registry.json")
+        self.loaded = {}
+
+    def get_current_keys(self):
+        if not os.path.exists(self.registry_path):
+            return {}
+        with open(self.registry_path, mode="r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def set_current(self, metadata_by_position):
+        """ Points the registry at the given models; other positions keep their current model. """
+        keys = self.get_current_keys()
+        keys.update({position: metadata["key"] for position, metadata in metadata_by_position.items()})
+        write_json_atomic(self.registry_path, keys)
+        for position in metadata_by_position:
+            self.loaded.pop(position, None)
+
+    def train(self, data, holdout_years, workers=None, force=False):
+        """
+        Brings every position's model up to date, retraining only positions whose config or training
+        data changed. Positions are fit in parallel processes that split the CPU cores between them.
+        :param data: Dict position -> DataFrame from load_model_data.
+        :return: Dict position -> metadata of the current model.
+        """
+        workers = workers or len(data)
+        n_jobs = max(1, (os.cpu_count() or 1) // workers)
+        if workers == 1:
+            metadata = {position: train_or_reuse(position, df, holdout_years, n_jobs, self.models_dir, force)
+                        for position, df in data.items()}
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    position: executor.submit(train_or_reuse, position, df, holdout_years, n_jobs, self.models_dir, force)
+                    for position, df in data.items()
+                }
+                metadata = {position: future.result() for position, future in futures.items()}
+
+        # Written once by this process, so parallel workers never race on registry.json
+        self.set_current(metadata)
+        return metadata
+
+    def get(self, position):
+        """
+        :return: (xgb.Booster, metadata) of the position's current model.
+        :raises LookupError: If the position has not been trained yet.
+        """
+        if position not in self.loaded:
+            key = self.get_current_keys().get(position)
+            if key is None:
+                raise LookupError(f"No {position} model has been trained yet. Run: run_models.py train {position}")
+
+            with open(os.path.join(self.models_dir, position.lower(), f"{key}.json"), mode="r", encoding="utf-8") as file:
+                metadata = json.load(file)
+            booster = xgb.Booster(model_file=os.path.join(self.models_dir, position.lower(), f"{key}.ubj"))
+            self.loaded[position] = (booster, metadata)
+        return self.loaded[position]
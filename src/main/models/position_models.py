@@ -0,0 +1,176 @@
+import time
+import hashlib
+import logging
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from main.maintenance.model_data import get_model_data_table
+
+# Per-position model setup, as tuned in the xgboost_{rb,wr,te}.ipynb notebooks.
+#   features            - model inputs; inverse_dc = 1 / (draft_cap + inverse_dc_offset)
+#   monotone_constraints - every feature should generally raise the prediction
+#   max_boost           - max FPPG added to elite prospects by stretch_elite_predictions (None = no boost)
+MODEL_SPECS = {
+    "RB": {
+        "features": ["size_score", "production_score", "inverse_dc"],
+        "monotone_constraints": "(1,1,1)",
+        "learning_rate": 0.1,
+        "inverse_dc_offset": 0,
+        "max_boost": None,
+    },
+    "WR": {
+        "features": ["cupps_score", "production_score", "inverse_dc"],
+        "monotone_constraints": "(1,1,1)",
+        "learning_rate": 0.05,
+        "inverse_dc_offset": 0,
+        "max_boost": 5,
+    },
+    "TE": {
+        "features": ["cupps_score", "production_score", "inverse_dc"],
+        "monotone_constraints": "(1,1,1)",
+        "learning_rate": 0.05,
+        "inverse_dc_offset": 1,
+        "max_boost": 5,
+    },
+}
+
+# XGBRegressor parameters shared by every position
+MODEL_PARAMS = {
+    "max_depth": 6,
+    "n_estimators": 300,
+    "subsample": 0.9,
+    "colsample_bytree": 0.7,
+    "objective": "reg:squarederror",
+    "random_state": 42,
+}
+
+# Columns loaded from the model data tables, and their types
+MODEL_DATA_COLUMNS = {
+    "player_id": "int64",
+    "name": "string",
+    "draft_year": "Int64",
+    "draft_cap": "float64",
+    "cupps_score": "float64",
+    "production_score": "float64",
+    "size_score": "float64",
+    "avg_fppg_nfl": "float64",
+}
+NUMERIC_COLUMNS = ["draft_cap", "cupps_score", "production_score", "size_score"]
+
+# Weight of each training sample = exp(cupps_score / SAMPLE_WEIGHT_SCALE)
+SAMPLE_WEIGHT_SCALE = 25
+
+def load_model_data(db_util, positions=None, draft_years=None, player_ids=None):
+    """
+    Loads the model inputs of every position in one query over the materialized model data tables.
+    :param draft_years: Only load these draft classes (default: all players).
+    :param player_ids: Only load these players (default: all players).
+    :return: Dict position -> DataFrame with the MODEL_DATA_COLUMNS types (Decimals become floats, NULLs NaN).
+    """
+    positions = positions or list(MODEL_SPECS)
+    conditions = []
+    filter_params = []
+    for column, values in (("draft_year", draft_years), ("player_id", player_ids)):
+        if values:
+            conditions.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+            filter_params.extend(values)
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    selects = []
+    params = []
+    for position in positions:
+        selects.append(f"SELECT '{position}' AS model_position, {', '.join(MODEL_DATA_COLUMNS)} "
+                       f"FROM {get_model_data_table(position)} {where_clause}")
+        params.extend(filter_params)
+
+    db_util.cursor.execute(" UNION ALL ".join(selects), params)
+    rows = db_util.cursor.fetchall()
+
+    columns = ["model_position"] + list(MODEL_DATA_COLUMNS)
+    df = pd.DataFrame.from_records(rows, columns=columns)
+    # Decimal columns are converted once per column instead of checking every value
+    for column, dtype in MODEL_DATA_COLUMNS.items():
+        if dtype == "float64":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+        else:
+            df[column] = df[column].astype(dtype)
+
+    return {position: df[df["model_position"] == position].drop(columns="model_position").reset_index(drop=True)
+            for position in positions}
+
+def prepare_features(df, position, training=False):
+    """
+    Fills missing values and derives inverse_dc as the notebooks do.
+    Missing numeric inputs get the mean of the same frame (training set or draft class).
+    When training, a missing avg_fppg_nfl (never played 10 games in a season) counts as a bust: 0.
+    :return: (feature DataFrame, filled input DataFrame)
+    """
+    spec = MODEL_SPECS[position]
+    df = df.copy()
+    if training:
+        df["avg_fppg_nfl"] = df["avg_fppg_nfl"].fillna(0)
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].fillna(df[NUMERIC_COLUMNS].mean())
+    df["inverse_dc"] = 1 / (df["draft_cap"].fillna(300) + spec["inverse_dc_offset"])
+    return df[spec["features"]], df
+
+def get_sample_weights(df):
+    """ Exponentially weights samples with higher CUPPS scores. """
+    return np.exp(df["cupps_score"] / SAMPLE_WEIGHT_SCALE)
+
+def stretch_elite_predictions(preds, cupps, max_boost=5, steepness=0.25, center=80):
+    """
+    Boosts the FPPG predictions of elite prospects: the boost is max_boost / 2 at a CUPPS score of
+    center, less below it, and approaches max_boost as the score nears 100.
+    """
+    boost = max_boost / (1 + np.exp(-steepness * (cupps - center)))
+    return preds + boost
+
+def build_model(position, n_jobs=None, **overrides):
+    spec = MODEL_SPECS[position]
+    params = {**MODEL_PARAMS, "learning_rate": spec["learning_rate"],
+              "monotone_constraints": spec["monotone_constraints"], "n_jobs": n_jobs, **overrides}
+    return xgb.XGBRegressor(**params)
+
+def get_training_set(df, holdout_years):
+    """ Drafted players outside the holdout draft classes (e.g. the class being predicted). """
+    return df[df["draft_year"].notna() & ~df["draft_year"].isin(holdout_years)].reset_index(drop=True)
+
+def get_training_data(position, df, holdout_years):
+    """ :return: (features, target, sample weights) of every drafted player outside the holdout years. """
+    X_train, df_train = prepare_features(get_training_set(df, holdout_years), position, training=True)
+    return X_train, df_train["avg_fppg_nfl"], get_sample_weights(df_train)
+
+def get_training_fingerprint(X_train, y_train, sample_weights):
+    """ Hash of the exact rows a model is fit on; it changes whenever any training input or target does. """
+    digest = hashlib.sha256()
+    digest.update(",".join(X_train.columns).encode("utf-8"))
+    for values in (X_train, y_train, sample_weights):
+        digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def fit_position_model(position, X_train, y_train, sample_weights, n_jobs=None):
+    """ :return: Fitted XGBRegressor. """
+    start_time = time.perf_counter()
+    model = build_model(position, n_jobs=n_jobs)
+    model.fit(X_train, y_train, sample_weight=sample_weights)
+    logging.info(f"✅ Trained {position} model on {len(X_train)} players in {time.perf_counter() - start_time:.2f}s")
+    return model
+
+def predict_players(booster, metadata, df):
+    """
+    Predicts NFL FPPG for the given players with a saved booster (see model_registry.ModelRegistry).
+    :return: DataFrame of player_id, name, draft_cap, cupps_score, production_score and predicted_fppg, best first.
+    """
+    position = metadata["position"]
+    if metadata["features"] != MODEL_SPECS[position]["features"]:
+        raise ValueError(f"Saved {position} model was trained on {metadata['features']}, "
+                         f"expected {MODEL_SPECS[position]['features']}. Retrain it.")
+
+    X, df = prepare_features(df, position)
+    predictions = booster.inplace_predict(X)
+    if metadata["max_boost"] is not None:
+        predictions = stretch_elite_predictions(predictions, df["cupps_score"].to_numpy(), metadata["max_boost"])
+
+    results = df[["player_id", "name", "draft_cap", "cupps_score", "production_score", "avg_fppg_nfl"]].copy()
+    results["predicted_fppg"] = np.round(predictions, 2)
+    return results.sort_values("predicted_fppg", ascending=False).reset_index(drop=True)
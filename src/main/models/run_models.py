@@ -0,0 +1,69 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add "src" to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from main.util.db_util import DatabaseUtility
+from main.maintenance.model_data import refresh_model_data
+from main.models.position_models import MODEL_SPECS, load_model_data, predict_players
+from main.models.model_registry import ModelRegistry
+
+def print_predictions(position, title, predictions):
+    print(f"\nSorted {position} Predictions ({title}):")
+    print("-" * 60)
+    print(f"{'name':<25} {'CUPPS':>6} {'Pick':>6} {'Predicted':>10}")
+    print(f"{'':<25} {'Score':>6} {'':>6} {'FPPG':>10}")
+    print("-" * 60)
+    for row in predictions.itertuples(index=False):
+        pick = "" if row.draft_cap != row.draft_cap else f"{row.draft_cap:.0f}"  # NaN for undrafted players
+        print(f"{str(row.name)[:24]:<25} {row.cupps_score:6.2f} {pick:>6} {row.predicted_fppg:10.2f}")
+    print("-" * 60)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Train the position models or predict NFL FPPG for a draft class.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Fit and save the position models")
+    train_parser.add_argument("positions", nargs="*", type=str.upper, help="Positions to train (default: RB WR TE)")
+    train_parser.add_argument("--holdout-years", nargs="*", type=int,
+                              help="Draft classes left out of training (default: the newest class)")
+    train_parser.add_argument("--workers", type=int, help="Processes to train in (default: one per position)")
+    train_parser.add_argument("--force", action="store_true",
+                              help="Retrain even if the training data has not changed since the saved model")
+
+    predict_parser = subparsers.add_parser("predict", help="Predict a draft class with the saved models")
+    predict_parser.add_argument("positions", nargs="*", type=str.upper, help="Positions to predict (default: RB WR TE)")
+    predict_targets = predict_parser.add_mutually_exclusive_group(required=True)
+    predict_targets.add_argument("--draft-year", type=int, help="Draft class to predict")
+    predict_targets.add_argument("--player-ids", nargs="+", type=int, help="Individual prospects to predict")
+
+    args = parser.parse_args()
+    positions = args.positions or list(MODEL_SPECS)
+
+    with DatabaseUtility() as db_util:
+        refresh_model_data(db_util)
+        if args.command == "train":
+            data = load_model_data(db_util, positions)
+        else:
+            data = load_model_data(db_util, positions, [args.draft_year] if args.draft_year else None, args.player_ids)
+
+    registry = ModelRegistry()
+
+    if args.command == "train":
+        holdout_years = args.holdout_years
+        if holdout_years is None:
+            holdout_years = [int(max(df["draft_year"].max() for df in data.values()))]
+        logging.info(f"🚀 Training {', '.join(positions)} models (holding out draft years {holdout_years})...")
+        registry.train(data, holdout_years, args.workers, args.force)
+    else:
+        title = f"{args.draft_year} Prospects" if args.draft_year else "Selected Prospects"
+        for position in positions:
+            if data[position].empty:
+                continue
+            booster, metadata = registry.get(position)
+            print_predictions(position, title, predict_players(booster, metadata, data[position]))
@@ -0,0 +1,54 @@
+import argparse
+import logging
+import sys
+import os
+
+# Add "src" to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from main.util.db_util import DatabaseUtility
+from main.maintenance.model_data import refresh_model_data
+from main.models.position_models import MODEL_SPECS, load_model_data
+from main.models.tuning import tune_positions
+
+DEFAULT_REPORT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "reports", "tuning_results.csv"))
+
+SUMMARY_COLUMNS = ["max_depth", "learning_rate", "n_estimators", "subsample", "colsample_bytree", "min_child_weight",
+                   "rmse_mean", "rmse_std", "mae_mean", "r2_mean", "rmse_vs_baseline", "baseline"]
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(
+        description="Tune the position models with leave-one-draft-year-out cross-validation.")
+    parser.add_argument("positions", nargs="*", type=str.upper, help="Positions to tune (default: RB WR TE)")
+    parser.add_argument("--search", choices=["grid", "random"], default="random",
+                        help="Try every combination of the grid or a random sample of it (default: random)")
+    parser.add_argument("--n-iter", type=int, default=50, help="Parameter sets sampled per position (default: 50)")
+    parser.add_argument("--seed", type=int, default=42, help="Random search seed (default: 42)")
+    parser.add_argument("--holdout-years", nargs="*", type=int,
+                        help="Draft classes left out of tuning (default: the newest class)")
+    parser.add_argument("--workers", type=int, help="Processes to evaluate in (default: all cores)")
+    parser.add_argument("--top", type=int, default=10, help="Rows per position printed (default: 10)")
+    parser.add_argument("--report", default=DEFAULT_REPORT_PATH,
+                        help="CSV file for the full comparison table (default: models/reports/tuning_results.csv)")
+    args = parser.parse_args()
+
+    positions = args.positions or list(MODEL_SPECS)
+    with DatabaseUtility() as db_util:
+        refresh_model_data(db_util)
+        data = load_model_data(db_util, positions)
+
+    holdout_years = args.holdout_years
+    if holdout_years is None:
+        holdout_years = [int(max(df["draft_year"].max() for df in data.values()))]
+
+    table = tune_positions(data, holdout_years, args.search, args.n_iter, args.seed, args.workers)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+    table.to_csv(args.report, index=False)
+    logging.info(f"📝 Wrote {len(table)} results to {args.report}")
+
+    for position, results in table.groupby("position", sort=False):
+        print(f"\n📊 {position} (leave-one-draft-year-out, {results['folds'].iloc[0]} folds)")
+        print(results[SUMMARY_COLUMNS].head(args.top).to_string(index=False, float_format=lambda value: f"{value:.3f}"))
@@ -0,0 +1,139 @@
+import os
+import time
+import random
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from main.models.position_models import MODEL_SPECS, MODEL_PARAMS, get_training_set, get_training_data
+
+# Search space; --search grid tries every combination, --search random samples from it
+PARAM_GRID = {
+    "max_depth": [3, 4, 6],
+    "learning_rate": [0.03, 0.05, 0.1],
+    "n_estimators": [150, 300, 500],
+    "subsample": [0.8, 0.9, 1.0],
+    "colsample_bytree": [0.7, 1.0],
+    "min_child_weight": [1, 5],
+}
+
+# Built once per worker process by init_worker: position -> training DMatrix and its leave-one-year-out folds
+_position_data = {}
+
+def get_baseline_params(position):
+    """ The notebook parameters, always evaluated so every candidate can be compared against them. """
+    return {key: MODEL_PARAMS[key] for key in ("max_depth", "n_estimators", "subsample", "colsample_bytree")} | \
+        {"learning_rate": MODEL_SPECS[position]["learning_rate"], "min_child_weight": 1}
+
+def get_candidates(search="grid", n_iter=50, seed=42):
+    """ :return: List of parameter dicts from PARAM_GRID. """
+    keys = list(PARAM_GRID)
+    combinations = [dict(zip(keys, values)) for values in itertools.product(*(PARAM_GRID[key] for key in keys))]
+    if search == "random" and n_iter < len(combinations):
+        combinations = random.Random(seed).sample(combinations, n_iter)
+    return combinations
+
+def get_cv_inputs(position, df, holdout_years):
+    """
+    Training features, target, weights and draft years of a position as plain arrays, cheap to send to workers.
+    Each draft class of the training set is left out once. Missing inputs are mean-filled once over the
+    whole training set (as in train), so all folds can share one DMatrix.
+    """
+    X, y, weights = get_training_data(position, df, holdout_years)
+    df = get_training_set(df, holdout_years)
+    return {
+        "features": list(X.columns),
+        "X": X.to_numpy(dtype=np.float32),
+        "y": y.to_numpy(dtype=np.float32),
+        "weights": weights.to_numpy(dtype=np.float32),
+        "draft_years": df["draft_year"].to_numpy(dtype=np.int64),
+    }
+
+def init_worker(cv_inputs):
+    """ Builds each position's DMatrix and fold slices once per process instead of once per candidate. """
+    for position, inputs in cv_inputs.items():
+        dmatrix = xgb.DMatrix(inputs["X"], label=inputs["y"], weight=inputs["weights"],
+                              feature_names=inputs["features"], nthread=1)
+        folds = []
+        for year in np.unique(inputs["draft_years"]):
+            validation_rows = np.flatnonzero(inputs["draft_years"] == year)
+            training_rows = np.flatnonzero(inputs["draft_years"] != year)
+            folds.append((int(year), dmatrix.slice(training_rows), dmatrix.slice(validation_rows), validation_rows))
+        _position_data[position] = {"y": inputs["y"], "folds": folds}
+
+def evaluate_candidate(position, candidate):
+    """
+    Leave-one-draft-year-out CV of one parameter set, single-threaded (the pool provides the parallelism).
+    :return: Dict of the parameters and the mean/std RMSE, MAE and R² over the held-out classes.
+    """
+    data = _position_data[position]
+    params = {
+        "objective": MODEL_PARAMS["objective"],
+        "tree_method": "hist",
+        "max_depth": candidate["max_depth"],
+        "eta": candidate["learning_rate"],
+        "subsample": candidate["subsample"],
+        "colsample_bytree": candidate["colsample_bytree"],
+        "min_child_weight": candidate["min_child_weight"],
+        "monotone_constraints": MODEL_SPECS[position]["monotone_constraints"],
+        "seed": MODEL_PARAMS["random_state"],
+        "nthread": 1,
+    }
+
+    predictions = np.empty_like(data["y"])
+    rmse, mae, r2 = [], [], []
+    for year, dtrain, dvalidation, validation_rows in data["folds"]:
+        booster = xgb.train(params, dtrain, num_boost_round=candidate["n_estimators"])
+        fold_predictions = booster.predict(dvalidation)
+        predictions[validation_rows] = fold_predictions
+
+        actual = data["y"][validation_rows]
+        errors = actual - fold_predictions
+        rmse.append(np.sqrt(np.mean(errors ** 2)))
+        mae.append(np.mean(np.abs(errors)))
+        total = np.sum((actual - actual.mean()) ** 2)
+        r2.append(1 - np.sum(errors ** 2) / total if total > 0 else np.nan)
+
+    errors = data["y"] - predictions
+    return {
+        "position": position,
+        **candidate,
+        "rmse_mean": float(np.mean(rmse)),
+        "rmse_std": float(np.std(rmse)),
+        "mae_mean": float(np.mean(mae)),
+        "r2_mean": float(np.nanmean(r2)),
+        "rmse_pooled": float(np.sqrt(np.mean(errors ** 2))),
+        "folds": len(data["folds"]),
+    }
+
+def tune_positions(data, holdout_years, search="grid", n_iter=50, seed=42, workers=None):
+    """
+    Evaluates the baseline and every candidate for each position across a process pool.
+    :param data: Dict position -> DataFrame from load_model_data.
+    :param holdout_years: Draft classes left out entirely (e.g. the newest class, with no NFL seasons yet).
+    :return: DataFrame with one row per (position, parameter set), best mean RMSE first within each position.
+    """
+    start_time = time.perf_counter()
+    cv_inputs = {position: get_cv_inputs(position, df, holdout_years) for position, df in data.items()}
+    candidates = get_candidates(search, n_iter, seed)
+
+    tasks = []
+    for position in data:
+        baseline = get_baseline_params(position)
+        tasks.append((position, baseline, True))
+        tasks.extend((position, candidate, False) for candidate in candidates if candidate != baseline)
+
+    workers = workers or os.cpu_count() or 1
+    logging.info(f"🚀 Evaluating {len(tasks)} parameter sets across {workers} processes...")
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cv_inputs,)) as executor:
+        futures = [(executor.submit(evaluate_candidate, position, candidate), is_baseline)
+                   for position, candidate, is_baseline in tasks]
+        results = [future.result() | {"baseline": is_baseline} for future, is_baseline in futures]
+
+    logging.info(f"⏱️ Tuning finished in {time.perf_counter() - start_time:.1f}s")
+    table = pd.DataFrame(results).sort_values(["position", "rmse_mean"]).reset_index(drop=True)
+    baseline_rmse = table[table["baseline"]].set_index("position")["rmse_mean"]
+    table["rmse_vs_baseline"] = table["rmse_mean"] - table["position"].map(baseline_rmse)
+    return table
@@ -0,0 +1,48 @@
+import json
+import hashlib
+import logging
+
+# The cache table is created by src/main/sql/cupps_averages_cache.sql
+
+def get_input_fingerprint(db_util, fingerprint_queries):
+    """
+    Runs the fingerprint queries (row counts, max ids, column checksums) for a set of input tables
+    and hashes their results into a single fingerprint.
+    """
+    results = []
+    for query in fingerprint_queries:
+        db_util.cursor.execute(query)
+        results.append([str(value) for value in db_util.cursor.fetchone()])
+    return hashlib.sha256(json.dumps(results).encode("utf-8")).hexdigest()
+
+def get_cached_averages(db_util, cache_key, fingerprint_queries, compute_averages):
+    """
+    Returns the averages stored under cache_key if their input fingerprint still matches,
+    otherwise recomputes them with compute_averages(db_util) and stores the new result.
+    Values are normalized to plain floats so cached and fresh averages are interchangeable.
+    """
+    fingerprint = get_input_fingerprint(db_util, fingerprint_queries)
+
+    db_util.cursor.execute("""
+        SELECT fingerprint, payload FROM cupps_averages_cache WHERE cache_key = %s
+    """, (cache_key,))
+    row = db_util.cursor.fetchone()
+
+    if row and row[0] == fingerprint:
+        payload = row[1]
+        if isinstance(payload, (str, bytes, bytearray)):
+            payload = json.loads(payload)
+        logging.info(f"✅ Using cached {cache_key} averages (inputs unchanged).")
+        return payload
+
+    logging.info(f"🔍 {cache_key} averages inputs changed. Recomputing...")
+    averages = json.loads(json.dumps(compute_averages(db_util), default=float))
+
+    db_util.cursor.execute("""
+        INSERT INTO cupps_averages_cache (cache_key, fingerprint, payload)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint), payload = VALUES(payload)
+    """, (cache_key, fingerprint, json.dumps(averages)))
+    db_util.conn.commit()
+
+    return averages
@@ -1,6 +1,11 @@
 import math
 import logging
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+from averages_cache import get_cached_averages
+from change_tracking import (get_db_timestamp, get_scoring_state, count_dirty_players,
+                             clear_dirty_players, record_scoring_run)
+from score_report import log_player_scores, write_score_report
 
 # Set up logging configuration
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -9,6 +14,36 @@ import logging
 
 import logging
 
+# Positions the CUPPS score is defined for
+SCORED_POSITIONS = ("RB", "WR", "TE")
+
+# Connection pool used by scoring worker processes
+SCORING_POOL_NAME = "cupps_scoring"
+
+# Age adjustment multipliers for each position
+AGE_ADJUSTMENTS = {
+    "RB": {18: 1.35, 19: 1.30, 20: 1.25, 21: 0.90, 22: 0.80, 23: 0.70, 24: 0.60},
+    "WR": {18: 1.50, 19: 1.40, 20: 1.30, 21: 0.80, 22: 0.70, 23: 0.60, 24: 0.50},
+    "TE": {18: 1.20, 19: 1.15, 20: 1.10, 21: 1, 22: 0.90, 23: 0.80, 24: 0.70},
+}
+
+# Position-specific minimum touches for a season to count as valid
+TOUCH_THRESHOLDS = {
+    "RB": 20,   # Minimum rush attempts for a valid RB season
+    "WR": 5,   # Minimum receptions for a valid WR season
+    "TE": 5,   # Minimum receptions for a valid TE season
+}
+
+# Size score thresholds
+SIZE_RANGES = {
+    "RB": {"min_h": 67, "min_w": 190},
+    "WR": {"min_h": 70, "min_w": 190},
+    "TE": {"min_h": 75, "min_w": 240},
+}
+
+# Raw production score that maps to 100 for each position
+MAX_EXPECTED_PRODUCTION = {"RB": 2800, "WR": 2500, "TE": 1200}
+
 def get_global_pff_averages(db_util):
     """
     Fetches global PFF averages for each position (RB, WR, TE) and stores them in a dictionary.
@@ -16,10 +51,11 @@ def get_global_pff_averages(db_util):
     """
     logging.info("🔍 Fetching NFL PFF averages for all positions...")
 
+    # Materialized copies of the *_model_data views (see src/main/sql/model_data_mv.sql)
     position_map = {
-        "RB": "rb_model_data",
-        "WR": "wr_model_data",
-        "TE": "te_model_data"
+        "RB": "rb_model_data_mv",
+        "WR": "wr_model_data_mv",
+        "TE": "te_model_data_mv"
     }
 
     global_averages = {}
@@ -52,42 +88,67 @@ def get_global_pff_averages(db_util):
 
     return global_averages
 
+# Draft capital buckets used for the RAS averages, as [low, high) draft_cap ranges
+RAS_BUCKETS = {
+    "elite": (0, 10),
+    "day_1": (10, 32),
+    "day_2": (32, 100),
+    "day_3": (100, 300)
+}
+
 def get_global_ras_averages(db_util):
     """
-    Fetches global RAS averages bucketed by position and draft_cap (expected draft value).
+    Fetches global RAS averages bucketed by position and draft_cap (expected draft value)
+    with a single grouped query.
     """
     logging.info("🔍 Fetching RAS averages by draft bucket...")
 
-    positions = ["RB", "WR", "TE"]
-    buckets = {
-        "elite": (0, 10),
-        "day_1": (10, 32),
-        "day_2": (32, 100),
-        "day_3": (100, 300)
-    }
+    bucket_cases = " ".join(
+        f"WHEN draft_cap >= {low} AND draft_cap < {high} THEN '{bucket_name}'"
+        for bucket_name, (low, high) in RAS_BUCKETS.items()
+    )
+    db_util.cursor.execute(f"""
+        SELECT position, CASE {bucket_cases} END AS bucket, AVG(ras) AS avg_ras
+        FROM player
+        WHERE position IN ({",".join(["%s"] * len(SCORED_POSITIONS))})
+          AND ras IS NOT NULL
+          AND draft_cap >= %s
+          AND draft_cap < %s
+        GROUP BY position, bucket
+    """, (*SCORED_POSITIONS, min(low for low, _ in RAS_BUCKETS.values()), max(high for _, high in RAS_BUCKETS.values())))
+    results = {(position, bucket): avg_ras for position, bucket, avg_ras in db_util.cursor.fetchall()}
 
     ras_averages = {}
-
-    for position in positions:
+    for position in SCORED_POSITIONS:
         ras_averages[position] = {}
-        for bucket_name, (low, high) in buckets.items():
-            query = """
-                SELECT AVG(ras) AS avg_ras
-                FROM player
-                WHERE position = %s
-                  AND ras IS NOT NULL
-                  AND draft_cap >= %s
-                  AND draft_cap < %s
-            """
-            db_util.cursor.execute(query, (position, low, high))
-            result = db_util.cursor.fetchone()
-
-            ras_averages[position][bucket_name] = result[0] if result and result[0] is not None else 5.0  # Default to 5.0
+        for bucket_name in RAS_BUCKETS:
+            avg_ras = results.get((position, bucket_name))
+            ras_averages[position][bucket_name] = avg_ras if avg_ras is not None else 5.0  # Default to 5.0
             logging.info(f"✅ Avg RAS for {position} ({bucket_name}): {ras_averages[position][bucket_name]:.2f}")
 
     return ras_averages
 
+# Cheap per-table checksums of every column the global averages read. If none of these change,
+# the cached averages are still valid.
+PFF_AVERAGES_FINGERPRINT_QUERIES = [
+    f"""
+        SELECT COUNT(*), MAX(player_id),
+               BIT_XOR(CRC32(CONCAT_WS('|', player_id,
+                                       IFNULL(avg_pff_run_grade, 'null'), IFNULL(avg_pff_rec_grade, 'null'),
+                                       IFNULL(avg_yprr, 'null'), IFNULL(avg_tprr, 'null'))))
+        FROM {table_name}
+    """
+    for table_name in ("rb_model_data_mv", "wr_model_data_mv", "te_model_data_mv")
+]
 
+RAS_AVERAGES_FINGERPRINT_QUERIES = [
+    """
+        SELECT COUNT(*), MAX(player_id),
+               BIT_XOR(CRC32(CONCAT_WS('|', player_id, IFNULL(position, 'null'),
+                                       IFNULL(draft_cap, 'null'), IFNULL(ras, 'null'))))
+        FROM player
+    """,
+]
 
 def get_age_multiplier(position, season_age):
     """Returns the age multiplier based on position and season age."""
@@ -95,15 +156,8 @@ def get_age_multiplier(position, season_age):
     if not season_age:
         return 1
     
-    # Define age adjustment multipliers for each position
-    age_adjustments = {
-        "RB": {18: 1.35, 19: 1.30, 20: 1.25, 21: 0.90, 22: 0.80, 23: 0.70, 24: 0.60},
-        "WR": {18: 1.50, 19: 1.40, 20: 1.30, 21: 0.80, 22: 0.70, 23: 0.60, 24: 0.50},
-        "TE": {18: 1.20, 19: 1.15, 20: 1.10, 21: 1, 22: 0.90, 23: 0.80, 24: 0.70},
-    }
-
     # Get position-specific age multipliers or use default (if position not in dict)
-    position_age_adjustments = age_adjustments.get(position, {})
+    position_age_adjustments = AGE_ADJUSTMENTS.get(position, {})
 
     # Return the position-specific multiplier or a default value (1 for neutral impact)
     return position_age_adjustments.get(season_age, 0.50 if season_age >= 25 else 1)
@@ -117,15 +171,8 @@ def is_valid_season(position, touches):
     :return: True if the season meets the minimum threshold, False otherwise.
     """
 
-    # ✅ Define position-specific thresholds
-    touch_thresholds = {
-        "RB": 20,   # Minimum rush attempts for a valid RB season
-        "WR": 5,   # Minimum receptions for a valid WR season
-        "TE": 5,   # Minimum receptions for a valid TE season
-    }
-
     # ✅ Get threshold for the given position, default to 0 if not listed
-    required_touches = touch_thresholds.get(position, 0)
+    required_touches = TOUCH_THRESHOLDS.get(position, 0)
 
     # ✅ Return True if touches meet or exceed the threshold, else False
     return touches >= required_touches
@@ -313,7 +360,7 @@ def calculate_production_score(position, seasons, global_pff_averages):
             (tprr_75 / 0.002) + 
             (big_szn_boost)
         )
-        max_expected_score = 2800 
+        max_expected_score = MAX_EXPECTED_PRODUCTION["RB"] 
 
     elif position == "WR":
         # ✅ Increase Peak Receiving Yards Boost - more boost if it was in their first 3 yrs
@@ -333,7 +380,7 @@ def calculate_production_score(position, seasons, global_pff_averages):
             (peak_team_yards_market_share * 150) +
             (big_szn_boost)
         )
-        max_expected_score = 2500
+        max_expected_score = MAX_EXPECTED_PRODUCTION["WR"]
 
     elif position == "TE":
         raw_production_score = (
@@ -344,7 +391,7 @@ def calculate_production_score(position, seasons, global_pff_averages):
             (peak_team_yards_market_share * 350) +
             ((total_market_share / valid_seasons)) * 350
         )
-        max_expected_score = 1200
+        max_expected_score = MAX_EXPECTED_PRODUCTION["TE"]
 
     else:
         logging.warn(f"Cannot calculate production score for player with position {position}")
@@ -361,15 +408,8 @@ def calculate_size_score(position, height, weight, ras, draft_cap=None, ras_aver
     if height is None or weight is None:
         return 0
 
-    # Size score thresholds
-    size_ranges = {
-        "RB": {"min_h": 67, "min_w": 190},
-        "WR": {"min_h": 70, "min_w": 190},
-        "TE": {"min_h": 75, "min_w": 240},
-    }
-
-    if position in size_ranges:
-        size_params = size_ranges[position]
+    if position in SIZE_RANGES:
+        size_params = SIZE_RANGES[position]
         height_score = 50 if height >= size_params["min_h"] else max(0, 50 - (size_params["min_h"] - height) * 6)
         weight_score = 50 if weight >= size_params["min_w"] else max(0, 50 - (size_params["min_w"] - weight) * 3)
         size_score = height_score + weight_score
@@ -393,69 +433,335 @@ def calculate_size_score(position, height, weight, ras, draft_cap=None, ras_aver
     ras_score = (ras * 10) if ras is not None else 70
     final_score = (ras_score * 0.8) + (size_score * 0.2)
 
-    print(f"Before scaling: size_score: {size_score}, ras_score: {ras_score}, final_score: {final_score}")
+    logging.debug("Before scaling: size_score: %s, ras_score: %s, final_score: %s", size_score, ras_score, final_score)
 
     return final_score
 
-def update_cupps_scores(db_util, positions=None):
-    """ 
-    🚀 CUPPS (Calculated Upside Player Prospect Score) calculation with optional position filtering. 
+def _to_float_array(values):
+    """ Converts a column of DB values (None/Decimal/int/float) into a float array with NaN for NULLs. """
+    return np.fromiter((np.nan if v is None else float(v) for v in values), dtype=float, count=len(values))
+
+def _or_default(values, default):
+    """ Vectorized `float(x or default)` - NULLs and zeros fall back to the default. """
+    return np.where(np.isnan(values) | (values == 0), default, values)
+
+def _grouped_max(values, groups, mask, num_groups):
+    """ Per-group max of the masked values, starting from 0 like the running peaks in the reference loop. """
+    peaks = np.zeros(num_groups)
+    np.maximum.at(peaks, groups[mask], values[mask])
+    return peaks
+
+def _grouped_percentile_75(values, groups, mask, num_groups, defaults):
     """
-    logging.info("🚀 Starting CUPPS score update process...")
+    Per-group 75th percentile of the masked values, falling back to the group's default when it has none.
+    Mirrors np.percentile's linear interpolation (including its lerp) so results match percentile_75 exactly.
+    """
+    values, groups = values[mask], groups[mask]
+    order = np.lexsort((values, groups))
+    values, groups = values[order], groups[order]
+
+    counts = np.bincount(groups, minlength=num_groups)
+    has_values = counts > 0
+    starts = np.cumsum(counts) - counts
+
+    virtual_index = (counts[has_values] - 1) * 0.75
+    previous_index = np.floor(virtual_index)
+    gamma = virtual_index - previous_index
+    previous_index = previous_index.astype(int)
+    next_index = np.minimum(previous_index + 1, counts[has_values] - 1)
+
+    a = values[starts[has_values] + previous_index]
+    b = values[starts[has_values] + next_index]
+    diff_b_a = b - a
+    interpolated = np.where(gamma >= 0.5, b - diff_b_a * (1 - gamma), a + diff_b_a * gamma)
+
+    result = np.asarray(defaults, dtype=float).copy()
+    result[has_values] = interpolated
+    return result
+
+def calculate_production_scores_vectorized(position_codes, season_groups, seasons, num_players, global_pff_averages):
+    """
+    Columnar version of calculate_production_score.
+    :param position_codes: Index into SCORED_POSITIONS for each player.
+    :param season_groups: Player index for each season row (rows grouped by player and ordered by year).
+    :param seasons: Dict of season column arrays keyed by name.
+    :param num_players: Number of players being scored.
+    :param global_pff_averages: Output of get_global_pff_averages.
+    :return: Array of production scores, one per player.
+    """
+    # ✅ Seasons without games played are ignored entirely
+    games_played = seasons["games_played"]
+    keep = ~np.isnan(games_played) & (games_played != 0)
+    groups = season_groups[keep]
+    season_position = position_codes[groups]
+    column = {name: values[keep] for name, values in seasons.items()}
+
+    def position_default(stat):
+        return np.array([float(global_pff_averages[pos][stat]) for pos in SCORED_POSITIONS])
+
+    pff_defaults = {stat: position_default(stat) for stat in ("pff_run", "pff_rec", "yprr", "tprr")}
+
+    scrim_ypg = _or_default(column["scrim_ypg"], 0)
+    fppg = _or_default(column["fppg"], 0)
+    pff_run = _or_default(column["pff_run"], pff_defaults["pff_run"][season_position])
+    pff_rec = _or_default(column["pff_rec"], pff_defaults["pff_rec"][season_position])
+    yprr = _or_default(column["yprr"], pff_defaults["yprr"][season_position])
+    tprr = _or_default(column["tprr"], pff_defaults["tprr"][season_position])
+    rush_yds = _or_default(column["rush_yds"], 0)
+    rec_yds = _or_default(column["rec_yds"], 0)
+    rush_att = _or_default(column["rush_att"], 0)
+    rec = _or_default(column["rec"], 0)
+    team_sos = _or_default(column["team_sos"], 0)
+    team_srs = _or_default(column["team_srs"], 0)
+    team_yards_market_share = _or_default(column["team_yards_market_share"], 0)
+    season_age = column["season_age"]
+    scrim_yds = rush_yds + rec_yds
+
+    # ✅ PFF metrics only count when a player is over a certain involvement threshold
+    rush_involved = rush_att > 20
+    rec_involved = rec > 10
+
+    peak_pff_run = _grouped_max(pff_run, groups, rush_involved, num_players)
+    peak_scrim_yds = _grouped_max(scrim_yds, groups, rush_involved, num_players)
+    peak_pff_rec = _grouped_max(pff_rec, groups, rec_involved, num_players)
+    peak_yprr = _grouped_max(yprr, groups, rec_involved, num_players)
+    peak_tprr = _grouped_max(tprr, groups, rec_involved, num_players)
+    peak_rec_yds = _grouped_max(rec_yds, groups, rec_involved, num_players)
+
+    # ✅ Peak season age comes from the last season that was either a qualifying rushing season
+    #    or a new running high in receiving yards - walk season ranks to get the running high
+    first_row = np.r_[True, groups[1:] != groups[:-1]]
+    season_rank = np.arange(len(groups)) - np.maximum.accumulate(np.where(first_row, np.arange(len(groups)), 0))
+    running_rec_yds = np.zeros(num_players)
+    prior_peak_rec_yds = np.zeros(len(groups))
+    rec_yds_involved = np.where(rec_involved, rec_yds, 0)
+    for rank in range(int(season_rank.max()) + 1 if len(groups) else 0):
+        rows = np.flatnonzero(season_rank == rank)
+        prior_peak_rec_yds[rows] = running_rec_yds[groups[rows]]
+        running_rec_yds[groups[rows]] = np.maximum(running_rec_yds[groups[rows]], rec_yds_involved[rows])
+
+    sets_peak_age = rush_involved | (rec_involved & (rec_yds > prior_peak_rec_yds))
+    last_peak_row = np.full(num_players, -1)
+    np.maximum.at(last_peak_row, groups[sets_peak_age], np.flatnonzero(sets_peak_age))
+    age_or_default = np.where(np.isnan(season_age) | (season_age == 0), 21, season_age)
+    peak_season_age = np.where(last_peak_row >= 0, age_or_default[np.maximum(last_peak_row, 0)], 0)
+
+    # Age-Based Adjustments
+    age_multiplier = np.ones(len(groups))
+    has_age = ~np.isnan(season_age) & (season_age != 0)
+    age_multiplier[has_age & (season_age >= 25)] = 0.50
+    for code, position in enumerate(SCORED_POSITIONS):
+        for age, multiplier in AGE_ADJUSTMENTS[position].items():
+            age_multiplier[(season_position == code) & (season_age == age)] = multiplier
+
+    # SOS/SRS Production Weighting - there is only one value per team-year, so evaluate math.tanh once
+    # per distinct value (np.tanh can differ from math.tanh in the last bit)
+    sos_srs_score, sos_index = np.unique((0.5 * team_sos + 0.5 * team_srs) / 50, return_inverse=True)
+    sos_multiplier = 1 + np.array([math.tanh(score) for score in sos_srs_score])[sos_index.reshape(-1)]
+
+    # ✅ Accumulate Weighted Stats (same multiplication order as weight_stats_by_age_and_sos)
+    weighted_scrim_ypg = scrim_ypg * age_multiplier * sos_multiplier
+    weighted_fppg = fppg * age_multiplier * sos_multiplier
+    weighted_market_share = team_yards_market_share * age_multiplier * sos_multiplier
+
+    total_scrim_ypg = np.bincount(groups, weights=weighted_scrim_ypg, minlength=num_players)
+    total_fppg = np.bincount(groups, weights=weighted_fppg, minlength=num_players)
+    total_market_share = np.bincount(groups, weights=weighted_market_share, minlength=num_players)
+    everything = np.ones(len(groups), dtype=bool)
+    peak_fppg = _grouped_max(weighted_fppg, groups, everything, num_players)
+    peak_team_yards_market_share = _grouped_max(weighted_market_share, groups, everything, num_players)
+
+    thresholds = np.array([TOUCH_THRESHOLDS[pos] for pos in SCORED_POSITIONS])
+    touches = np.where(season_position == SCORED_POSITIONS.index("RB"), rush_att, rec)
+    valid_seasons = np.bincount(groups, weights=touches >= thresholds[season_position], minlength=num_players)
+
+    pff_run_75 = _grouped_percentile_75(pff_run, groups, rush_involved, num_players, pff_defaults["pff_run"][position_codes])
+    pff_rec_75 = _grouped_percentile_75(pff_rec, groups, rec_involved, num_players, pff_defaults["pff_rec"][position_codes])
+    yprr_75 = _grouped_percentile_75(yprr, groups, rec_involved, num_players, pff_defaults["yprr"][position_codes])
+    tprr_75 = _grouped_percentile_75(tprr, groups, rec_involved, num_players, pff_defaults["tprr"][position_codes])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_scrim_ypg = total_scrim_ypg / valid_seasons
+        avg_fppg = total_fppg / valid_seasons
+        avg_market_share = total_market_share / valid_seasons
+
+    rb_boost = np.where(peak_scrim_yds > 1100, (peak_scrim_yds - 1100) * np.where(peak_season_age <= 20, 0.6, 0.2), 0)
+    rb_score = (
+        (avg_scrim_ypg * 2) +
+        (avg_fppg * 10) +
+        (peak_fppg * 8) +
+        (pff_run_75 * 1.5) +
+        (pff_rec_75 * 1.5) +
+        (peak_pff_run * 1.5) +
+        (peak_pff_rec * 1.5) +
+        (yprr_75 * 30) +
+        (tprr_75 / 0.002) +
+        (rb_boost)
+    )
 
-    # Build dynamic WHERE clause for positions
-    position_filter = ""
-    position_params = []
-    if positions:
-        placeholders = ",".join(["%s"] * len(positions))
-        position_filter = f"AND p.position IN ({placeholders})"
-        position_params = positions
+    wr_boost = np.where(peak_rec_yds > 1100, (peak_rec_yds - 1100) * np.where(peak_season_age <= 20, 0.75, 0.2), 0)
+    wr_score = (
+        (avg_scrim_ypg) +
+        (avg_fppg * 5) +
+        (peak_fppg * 5) +
+        (pff_rec_75 * 2) +
+        (peak_pff_rec * 4) +
+        (yprr_75 * 30) +
+        (peak_yprr * 60) +
+        (tprr_75 / 0.005) +
+        (peak_tprr / 0.001) +
+        (peak_team_yards_market_share * 150) +
+        (wr_boost)
+    )
 
-    # ✅ Fetch player_ids matching the filters
-    db_util.cursor.execute(f"""
-        SELECT DISTINCT p.player_id
-        FROM player p
-        LEFT JOIN cfb_player_year_stats c ON p.player_id = c.player_id
-        LEFT JOIN (
-            SELECT player_id, MIN(year) AS first_nfl_year
-            FROM nfl_player_year_stats
-            GROUP BY player_id
-        ) n ON p.player_id = n.player_id
-        WHERE c.player_id IS NOT NULL
-          AND (
-              (p.draft_cap IS NOT NULL AND p.draft_year >= 2013)
-              OR (n.first_nfl_year IS NOT NULL AND n.first_nfl_year >= 2013)
-          )
-          {position_filter}
-    """, position_params)
+    te_score = (
+        (avg_fppg * 10) +
+        (peak_fppg * 10) +
+        (peak_rec_yds * 0.1) +
+        (avg_scrim_ypg * 3) +
+        (peak_team_yards_market_share * 350) +
+        (avg_market_share) * 350
+    )
 
-    players = [row[0] for row in db_util.cursor.fetchall()]
-    if not players:
-        logging.info("⚠️ No players found to update.")
-        return
+    raw_production_score = np.choose(position_codes, [rb_score, wr_score, te_score])
+    max_expected_score = np.array([MAX_EXPECTED_PRODUCTION[pos] for pos in SCORED_POSITIONS])[position_codes]
+    production_scores = np.minimum(100, (raw_production_score / max_expected_score) * 100)
 
-    logging.info(f"🔍 Found {len(players)} players to update.")
+    return np.where(valid_seasons == 0, 0, production_scores)
 
-    # ✅ Fetch global averages
-    global_pff_averages = get_global_pff_averages(db_util)
-    global_ras_averages = get_global_ras_averages(db_util)
+def calculate_size_scores_vectorized(position_codes, height, weight, ras, draft_cap, ras_averages_by_bucket=None):
+    """ Columnar version of calculate_size_score (height/weight already defaulted). """
+    min_h = np.array([SIZE_RANGES[pos]["min_h"] for pos in SCORED_POSITIONS])[position_codes]
+    min_w = np.array([SIZE_RANGES[pos]["min_w"] for pos in SCORED_POSITIONS])[position_codes]
+    height_score = np.where(height >= min_h, 50, np.maximum(0, 50 - (min_h - height) * 6))
+    weight_score = np.where(weight >= min_w, 50, np.maximum(0, 50 - (min_w - weight) * 3))
+    size_score = height_score + weight_score
 
-    # ✅ Fetch detailed player data
-    logging.info("🔍 Fetching player and season data...")
-    db_util.cursor.execute(f"""
-        SELECT p.player_id, p.position, p.height, p.weight, p.birthday, p.draft_cap, p.draft_year, p.ras,
-               c.year, c.games_played, c.scrim_ypg, c.fppg, c.pff_run_grade, c.pff_rec_grade, c.yprr, c.tprr,
-               c.rec_yds, c.receptions, c.rush_att, c.rush_yds, COALESCE(t.team_sos, 0), COALESCE(t.team_srs, 0), c.season_age, c.team_yards_market_share
-        FROM player p
-        JOIN cfb_player_year_stats c ON p.player_id = c.player_id
-        LEFT JOIN team_year_stats t ON c.team_id = t.team_id AND c.year = t.year
-        WHERE p.player_id IN ({",".join(["%s"] * len(players))})
-        ORDER BY p.player_id, c.year
-    """, players)
+    # If missing RAS, select bucketed average based on draft_cap
+    ras = ras.copy()
+    if ras_averages_by_bucket is not None:
+        missing_cap = np.isnan(draft_cap)
+        bucket_names = np.select(
+            [draft_cap < 16, draft_cap < 33, draft_cap < 101],
+            ["elite", "day_1", "day_2"],
+            default="day_3"
+        )
+        for code, position in enumerate(SCORED_POSITIONS):
+            if position not in ras_averages_by_bucket:
+                continue
+            needs_ras = np.isnan(ras) & (position_codes == code)
+            for bucket_name in ("elite", "day_1", "day_2", "day_3"):
+                in_bucket = needs_ras & ~missing_cap & (bucket_names == bucket_name)
+                ras[in_bucket] = float(ras_averages_by_bucket[position][bucket_name])
+            ras[needs_ras & missing_cap] = 7
+
+    ras_score = np.where(np.isnan(ras), 70, ras * 10)
+    return (ras_score * 0.8) + (size_score * 0.2)
+
+def calculate_draft_cap_weights_vectorized(position_codes, draft_cap):
+    """ Columnar version of calculate_draft_cap_weight - undrafted players (NaN) get 0. """
+    dc = draft_cap
+    late_round = np.maximum(5, 10 - ((dc - 200) * 0.4))
+
+    rb = np.select(
+        [dc <= 10, dc <= 32, dc <= 64, dc <= 100, dc <= 150, dc <= 200],
+        [100, 90 - ((dc - 10) * 1.5), 85 - ((dc - 32) * 1.2), 70 - ((dc - 60) * 1.0),
+         40 - ((dc - 100) * 0.8), 20 - ((dc - 150) * 0.6)],
+        default=late_round
+    )
+    wr = np.select(
+        [dc <= 5, dc <= 15, dc <= 32, dc <= 64, dc <= 100, dc <= 200],
+        [100, 90 - ((dc - 10) * 1.5), 85 - ((dc - 32) * 1.25), 70 - ((dc - 60) * 1.0),
+         40 - ((dc - 100) * 0.8), 20 - ((dc - 150) * 0.6)],
+        default=late_round
+    )
+    te = np.select(
+        [dc <= 15, dc <= 32, dc <= 64, dc <= 100, dc <= 150, dc <= 200],
+        [100, 95 - ((dc - 10) * 1.2), 90 - ((dc - 32) * 0.75), 80 - ((dc - 60) * 0.65),
+         60 - ((dc - 100) * 0.55), 40 - ((dc - 150) * 0.45)],
+        default=late_round
+    )
 
-    # ✅ Group by player_id
+    weights = np.choose(position_codes, [rb, wr, te])
+    return np.where(np.isnan(dc), 0, weights)
+
+def score_players_vectorized(rows, global_pff_averages, global_ras_averages):
+    """
+    🚀 Columnar CUPPS scoring engine. Loads the joined player/season rows (see fetch_player_rows)
+    into NumPy arrays once and scores every player with grouped array operations.
+    :return: List of (player_id, position, production_score, size_score, draft_cap_weighted, cupps_score).
+    """
+    if not rows:
+        return []
+
+    columns = list(zip(*rows))
+    player_ids = np.asarray(columns[0])
+    years = _to_float_array(columns[8])
+
+    # ✅ Group seasons by player, keeping each player's seasons in year order
+    order = np.lexsort((years, player_ids))
+    player_ids = player_ids[order]
+    first_season = np.r_[True, player_ids[1:] != player_ids[:-1]]
+    season_groups = np.cumsum(first_season) - 1
+    player_rows = order[first_season]
+
+    positions = [columns[1][i] for i in player_rows]
+    scored = np.array([position in SCORED_POSITIONS for position in positions], dtype=bool)
+    for i in np.flatnonzero(~scored):
+        logging.warning(f"Cannot calculate production score for player {player_ids[first_season][i]} with position {positions[i]}")
+
+    # ✅ Only score positions the CUPPS formulas are defined for
+    if not scored.all():
+        keep_seasons = scored[season_groups]
+        order = order[keep_seasons]
+        player_ids = player_ids[keep_seasons]
+        first_season = np.r_[True, player_ids[1:] != player_ids[:-1]] if len(player_ids) else np.zeros(0, dtype=bool)
+        season_groups = np.cumsum(first_season) - 1
+        player_rows = order[first_season]
+        positions = [columns[1][i] for i in player_rows]
+
+    num_players = len(player_rows)
+    if num_players == 0:
+        return []
+
+    position_codes = np.array([SCORED_POSITIONS.index(position) for position in positions])
+
+    season_columns = ("year", "games_played", "scrim_ypg", "fppg", "pff_run", "pff_rec", "yprr", "tprr",
+                      "rec_yds", "rec", "rush_att", "rush_yds", "team_sos", "team_srs", "season_age",
+                      "team_yards_market_share")
+    seasons = {
+        name: _to_float_array(columns[8 + offset])[order]
+        for offset, name in enumerate(season_columns)
+    }
+
+    def player_column(index):
+        return _to_float_array([columns[index][i] for i in player_rows])
+
+    height = _or_default(player_column(2), 72)
+    weight = _or_default(player_column(3), 210)
+    draft_cap = player_column(5)
+    ras = player_column(7)
+
+    production_scores = calculate_production_scores_vectorized(
+        position_codes, season_groups, seasons, num_players, global_pff_averages
+    )
+    size_scores = calculate_size_scores_vectorized(position_codes, height, weight, ras, draft_cap, global_ras_averages)
+    draft_cap_weights = calculate_draft_cap_weights_vectorized(position_codes, draft_cap)
+    cupps_scores = np.minimum(100, (((production_scores * 2.25) +
+                                     (size_scores * 1) +
+                                     (draft_cap_weights * 2.75)) / 600) * 100)
+
+    return [
+        (player_id.item(), position, float(production), float(size), float(draft_cap_weighted), float(cupps))
+        for player_id, position, production, size, draft_cap_weighted, cupps in zip(
+            player_ids[first_season], positions, production_scores, size_scores, draft_cap_weights, cupps_scores
+        )
+    ]
+
+def group_player_rows(rows):
+    """ Groups the joined player/season rows by player_id for the per-player reference implementation. """
     player_data = {}
-    for row in db_util.cursor.fetchall():
+    for row in rows:
         player_id = row[0]
         if player_id not in player_data:
             player_data[player_id] = {
@@ -463,11 +769,17 @@ def update_cupps_scores(db_util, positions=None):
                 "seasons": []
             }
         player_data[player_id]["seasons"].append(row[8:])
+    return player_data
 
-    logging.info(f"✅ Grouped season data for {len(player_data)} players.")
+def score_players_reference(rows, global_pff_averages, global_ras_averages):
+    """
+    Per-player reference implementation of the CUPPS scoring engine.
+    :return: List of (player_id, position, production_score, size_score, draft_cap_weighted, cupps_score).
+    """
+    player_data = group_player_rows(rows)
+    logging.debug("✅ Grouped season data for %s players.", len(player_data))
 
-    # ✅ Compute scores and prepare updates
-    update_values = []
+    scores = []
     for player_id, data in player_data.items():
         position, height, weight, birthday, draft_cap, draft_year, ras = data["player_info"]
         height = height or 72
@@ -481,18 +793,255 @@ def update_cupps_scores(db_util, positions=None):
                                    (draft_cap_weighted * 2.75), 
                                    600)
 
-        logging.info(f"📊 Player {player_id} | Prod: {production_score:.2f}, Size: {size_score:.2f}, DraftCap: {draft_cap_weighted:.2f}, CUPPS: {cupps_score:.2f}")
-        update_values.append((production_score, size_score, cupps_score, player_id))
+        scores.append((player_id, position, production_score, size_score, draft_cap_weighted, cupps_score))
 
-    # ✅ Run update
-    logging.info(f"🔄 Updating {len(update_values)} players in the database...")
-    db_util.cursor.executemany(
-        "UPDATE player SET production_score = %s, size_score = %s, cupps_score = %s WHERE player_id = %s",
-        update_values
-    )
-    db_util.conn.commit()
+    return scores
+
+SCORING_ENGINES = {
+    "vectorized": score_players_vectorized,
+    "reference": score_players_reference,
+}
+
+def compare_scoring_engines(rows, global_pff_averages, global_ras_averages):
+    """
+    Scores the same rows with both engines and returns the players whose scores are not identical.
+    :return: List of (player_id, reference_scores, vectorized_scores) tuples.
+    """
+    # The reference implementation cannot score positions outside SCORED_POSITIONS
+    rows = [row for row in rows if row[1] in SCORED_POSITIONS]
+    reference = {row[0]: row for row in score_players_reference(rows, global_pff_averages, global_ras_averages)}
+    vectorized = {row[0]: row for row in score_players_vectorized(rows, global_pff_averages, global_ras_averages)}
+
+    mismatches = []
+    for player_id in reference.keys() | vectorized.keys():
+        expected, actual = reference.get(player_id), vectorized.get(player_id)
+        if expected is None or actual is None or tuple(expected[2:]) != tuple(actual[2:]):
+            mismatches.append((player_id, expected, actual))
+    return mismatches
+
+def build_player_rows_query(positions=None, dirty_only=False, shard=None):
+    """
+    Builds the joined player/season query for every player eligible for a CUPPS score, ordered by
+    player_id and year. Eligibility is evaluated on the server instead of through an IN-list of ids.
+    :param dirty_only: Only fetch players marked in cupps_dirty_player since the last scoring run.
+    :param shard: Optional (shard_index, shard_count) to only fetch players with player_id % shard_count == shard_index.
+    :return: (query, params)
+    """
+    # Build dynamic WHERE clause for positions
+    position_filter = ""
+    position_params = []
+    if positions:
+        placeholders = ",".join(["%s"] * len(positions))
+        position_filter = f"AND p.position IN ({placeholders})"
+        position_params = list(positions)
+
+    if dirty_only:
+        position_filter += " AND p.player_id IN (SELECT player_id FROM cupps_dirty_player)"
+
+    if shard:
+        shard_index, shard_count = shard
+        position_filter += " AND MOD(p.player_id, %s) = %s"
+        position_params += [shard_count, shard_index]
+
+    query = f"""
+        SELECT p.player_id, p.position, p.height, p.weight, p.birthday, p.draft_cap, p.draft_year, p.ras,
+               c.year, c.games_played, c.scrim_ypg, c.fppg, c.pff_run_grade, c.pff_rec_grade, c.yprr, c.tprr,
+               c.rec_yds, c.receptions, c.rush_att, c.rush_yds, COALESCE(t.team_sos, 0), COALESCE(t.team_srs, 0), c.season_age, c.team_yards_market_share
+        FROM player p
+        JOIN cfb_player_year_stats c ON p.player_id = c.player_id
+        LEFT JOIN team_year_stats t ON c.team_id = t.team_id AND c.year = t.year
+        LEFT JOIN (
+            SELECT player_id, MIN(year) AS first_nfl_year
+            FROM nfl_player_year_stats
+            GROUP BY player_id
+        ) n ON p.player_id = n.player_id
+        WHERE (
+              (p.draft_cap IS NOT NULL AND p.draft_year >= 2013)
+              OR (n.first_nfl_year IS NOT NULL AND n.first_nfl_year >= 2013)
+          )
+          {position_filter}
+        ORDER BY p.player_id, c.year
+    """
+    return query, position_params
+
+def fetch_player_rows(db_util, positions=None, dirty_only=False, shard=None):
+    """
+    Fetches the joined player/season rows for every player eligible for a CUPPS score,
+    ordered by player_id and year.
+    :param dirty_only: Only fetch players marked in cupps_dirty_player since the last scoring run.
+    """
+    logging.info("🔍 Fetching player and season data...")
+    query, params = build_player_rows_query(positions, dirty_only, shard)
+    db_util.cursor.execute(query, params)
+    rows = db_util.cursor.fetchall()
+
+    logging.info(f"🔍 Found {len({row[0] for row in rows})} players to update.")
+    return rows
+
+def stream_player_seasons(db_util, positions=None, dirty_only=False, shard=None, fetch_size=1000):
+    """
+    Generator over the same rows as fetch_player_rows, read through an unbuffered cursor.
+    Yields the season rows of one player as soon as that player's last season arrives,
+    so memory is bounded by a single fetch instead of the whole league history.
+    """
+    query, params = build_player_rows_query(positions, dirty_only, shard)
+    cursor = db_util.conn.cursor(buffered=False)
+    try:
+        cursor.execute(query, params)
+
+        player_rows = []
+        while True:
+            batch = cursor.fetchmany(fetch_size)
+            if not batch:
+                break
+
+            for row in batch:
+                if player_rows and row[0] != player_rows[0][0]:
+                    yield player_rows
+                    player_rows = []
+                player_rows.append(row)
+
+        if player_rows:
+            yield player_rows
+    finally:
+        cursor.close()
+
+def score_player_stream(player_stream, score_players, global_pff_averages, global_ras_averages, batch_size=500):
+    """
+    Scores players from stream_player_seasons in batches of batch_size players.
+    :param score_players: Scoring engine from SCORING_ENGINES.
+    :return: Generator of score tuples (see score_players_vectorized).
+    """
+    batch_rows, batch_players = [], 0
+    for player_rows in player_stream:
+        batch_rows.extend(player_rows)
+        batch_players += 1
+        if batch_players >= batch_size:
+            yield from score_players(batch_rows, global_pff_averages, global_ras_averages)
+            batch_rows, batch_players = [], 0
+
+    if batch_rows:
+        yield from score_players(batch_rows, global_pff_averages, global_ras_averages)
+
+def check_scoring_parity(db_util, positions=None):
+    """
+    Scores every eligible player with both engines without writing anything back.
+    :return: True if the vectorized engine reproduces the reference scores.
+    """
+    rows = fetch_player_rows(db_util, positions)
+    global_averages, _ = get_global_averages(db_util)
+
+    mismatches = compare_scoring_engines(rows, global_averages["pff"], global_averages["ras"])
+    for player_id, expected, actual in mismatches:
+        logging.error(f"❌ Player {player_id} | Reference: {expected} | Vectorized: {actual}")
+
+    if mismatches:
+        logging.error(f"❌ {len(mismatches)} players scored differently between engines.")
+    else:
+        logging.info("✅ Vectorized and reference engines produced identical scores.")
+    return not mismatches
+
+def get_global_averages(db_util, since_last_run=False):
+    """
+    Fetches the global PFF and RAS averages through the persistent averages cache, so they are
+    only recomputed when the PFF or RAS inputs change.
+    :param since_last_run: Also report whether the averages differ from the ones the last scoring run used.
+    :return: (global_averages, averages_changed) where global_averages holds "pff" and "ras" dicts.
+    """
+    global_averages = {
+        "pff": get_cached_averages(db_util, "pff", PFF_AVERAGES_FINGERPRINT_QUERIES, get_global_pff_averages),
+        "ras": get_cached_averages(db_util, "ras", RAS_AVERAGES_FINGERPRINT_QUERIES, get_global_ras_averages),
+    }
+    if not since_last_run:
+        return global_averages, True
+
+    state = get_scoring_state(db_util)
+    return global_averages, global_averages != state["global_averages"]
+
+def score_eligible_players(db_util, global_averages, positions=None, engine="vectorized", dirty_only=False,
+                           stream=False, batch_size=500, shard=None):
+    """
+    Fetches (or streams) the eligible players and scores them with the chosen engine.
+    :return: List of score tuples (see score_players_vectorized).
+    """
+    score_players = SCORING_ENGINES[engine]
+    if stream:
+        player_stream = stream_player_seasons(db_util, positions, dirty_only=dirty_only, shard=shard)
+        return list(score_player_stream(player_stream, score_players, global_averages["pff"], global_averages["ras"], batch_size))
+
+    rows = fetch_player_rows(db_util, positions, dirty_only=dirty_only, shard=shard)
+    return score_players(rows, global_averages["pff"], global_averages["ras"])
+
+def score_partition(db_class, global_averages, shard, **kwargs):
+    """
+    Worker entry point for parallel scoring. Opens its own DB connection, scores one
+    player_id shard with the pre-fetched global averages and returns the scores to the parent.
+    """
+    # A worker process that scores several shards reuses its pooled connection between them
+    with db_class(pool_name=SCORING_POOL_NAME, pool_size=1) as db_util:
+        scores = score_eligible_players(db_util, global_averages, shard=shard, **kwargs)
+        logging.info(f"✅ Shard {shard[0] + 1}/{shard[1]} scored {len(scores)} players.")
+        return scores
+
+def update_cupps_scores(db_util, positions=None, engine="vectorized", since_last_run=False, stream=False, batch_size=500,
+                        workers=1, report_path=None):
+    """ 
+    🚀 CUPPS (Calculated Upside Player Prospect Score) calculation with optional position filtering. 
+    :param engine: "vectorized" (default) or "reference" for the per-player implementation.
+    :param since_last_run: Only rescore players whose inputs changed since the last scoring run.
+                           Everyone is rescored if the global averages changed.
+    :param stream: Stream season rows through an unbuffered cursor and score batch_size players at a time
+                   instead of loading the full season history into memory.
+    :param workers: Number of processes to score in. Players are split across workers by player_id, each
+                    worker uses its own DB connection, and all scores are written back in one bulk update.
+    :param report_path: Optional CSV path for the per-player score breakdown, written once at the end.
+    """
+    logging.info("🚀 Starting CUPPS score update process...")
+    watermark = get_db_timestamp(db_util)
 
-    logging.info(f"✅ CUPPS scores updated for {len(update_values)} players successfully!")
+    # ✅ Fetch global averages
+    global_averages, averages_changed = get_global_averages(db_util, since_last_run)
+
+    dirty_only = since_last_run and not averages_changed
+    if since_last_run and averages_changed:
+        logging.info("⚠️ Global averages changed since the last run. Rescoring every player.")
+    elif dirty_only:
+        logging.info(f"🔍 {count_dirty_players(db_util)} players changed since the last run.")
+
+    # ✅ Compute scores and prepare updates
+    scoring_options = {"positions": positions, "engine": engine, "dirty_only": dirty_only,
+                       "stream": stream, "batch_size": batch_size}
+    if workers > 1:
+        logging.info(f"🔀 Scoring across {workers} worker processes...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(score_partition, type(db_util), global_averages, (shard_index, workers), **scoring_options)
+                for shard_index in range(workers)
+            ]
+            scores = [score for future in futures for score in future.result()]
+    else:
+        scores = score_eligible_players(db_util, global_averages, **scoring_options)
+
+    log_player_scores(scores)
+
+    update_values = [
+        (player_id, production_score, size_score, cupps_score)
+        for player_id, position, production_score, size_score, draft_cap_weighted, cupps_score in scores
+    ]
+
+    if not update_values:
+        logging.info("⚠️ No players found to update.")
+    else:
+        # ✅ Run update - one staging table load and a single UPDATE ... JOIN
+        logging.info(f"🔄 Updating {len(update_values)} players in the database...")
+        db_util.bulk_update("player", "player_id", ["production_score", "size_score", "cupps_score"], update_values)
 
+        logging.info(f"✅ CUPPS scores updated for {len(update_values)} players successfully!")
 
+    if report_path and scores:
+        write_score_report(scores, report_path)
 
+    # ✅ Everything marked before this run started has now been scored
+    clear_dirty_players(db_util, watermark, positions)
+    if not positions:
+        record_scoring_run(db_util, watermark, global_averages)
@@ -0,0 +1,68 @@
+import json
+import logging
+
+# The tables and triggers used here are created by src/main/sql/cupps_change_tracking.sql
+
+def get_db_timestamp(db_util):
+    """ Returns the DB server's current timestamp, used as the watermark for a scoring run. """
+    db_util.cursor.execute("SELECT CURRENT_TIMESTAMP(6)")
+    return db_util.cursor.fetchone()[0]
+
+def get_scoring_state(db_util):
+    """
+    Fetches the bookkeeping row for the last scoring run.
+    :return: Dict with last_run_at and the global averages used by the last run (or None).
+    """
+    db_util.cursor.execute("""
+        SELECT last_run_at, global_averages
+        FROM cupps_scoring_state
+        WHERE state_id = 1
+    """)
+    row = db_util.cursor.fetchone()
+    if not row:
+        return {"last_run_at": None, "global_averages": None}
+
+    last_run_at, global_averages = row
+    if isinstance(global_averages, (str, bytes, bytearray)):
+        global_averages = json.loads(global_averages)
+    return {"last_run_at": last_run_at, "global_averages": global_averages}
+
+def count_dirty_players(db_util):
+    db_util.cursor.execute("SELECT COUNT(*) FROM cupps_dirty_player")
+    return db_util.cursor.fetchone()[0]
+
+def clear_dirty_players(db_util, watermark, positions=None):
+    """
+    Removes players marked dirty at or before the watermark. Players re-marked after the
+    watermark (e.g. by a spider running during scoring) stay dirty for the next run.
+    """
+    position_filter = ""
+    params = [watermark]
+    if positions:
+        position_filter = f"AND p.position IN ({','.join(['%s'] * len(positions))})"
+        params += list(positions)
+
+    db_util.cursor.execute(f"""
+        DELETE d FROM cupps_dirty_player d
+        JOIN player p ON d.player_id = p.player_id
+        WHERE d.marked_at <= %s
+          {position_filter}
+    """, params)
+
+    # Players deleted from the player table can never be scored
+    db_util.cursor.execute("""
+        DELETE d FROM cupps_dirty_player d
+        LEFT JOIN player p ON d.player_id = p.player_id
+        WHERE p.player_id IS NULL AND d.marked_at <= %s
+    """, (watermark,))
+    db_util.conn.commit()
+
+def record_scoring_run(db_util, watermark, global_averages):
+    """ Stores the watermark and the global averages used by a completed all-positions scoring run. """
+    db_util.cursor.execute("""
+        UPDATE cupps_scoring_state
+        SET last_run_at = %s, global_averages = %s
+        WHERE state_id = 1
+    """, (watermark, json.dumps(global_averages)))
+    db_util.conn.commit()
+    logging.info(f"✅ Recorded scoring run watermark {watermark}")
@@ -0,0 +1,30 @@
+import os
+import csv
+import logging
+
+SCORE_REPORT_FIELDS = ["player_id", "position", "production_score", "size_score", "draft_cap_weighted", "cupps_score"]
+
+# Default location of the per-player score breakdown written by update_cupps.py
+DEFAULT_REPORT_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "reports", "cupps_score_breakdown.csv")
+)
+
+def log_player_scores(scores):
+    """ Logs the per-player breakdown at DEBUG level only, without formatting anything otherwise. """
+    if not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+
+    for player_id, position, production_score, size_score, draft_cap_weighted, cupps_score in scores:
+        logging.debug("📊 Player %s (%s) | Prod: %.2f, Size: %.2f, DraftCap: %.2f, CUPPS: %.2f",
+                      player_id, position, production_score, size_score, draft_cap_weighted, cupps_score)
+
+def write_score_report(scores, report_path=DEFAULT_REPORT_PATH):
+    """ Writes the per-player score breakdown of a scoring run to a CSV file in one pass. """
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+
+    with open(report_path, mode="w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(SCORE_REPORT_FIELDS)
+        writer.writerows(scores)
+
+    logging.info(f"📝 Wrote score breakdown for {len(scores)} players to {report_path}")
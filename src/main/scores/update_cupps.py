@@ -1,3 +1,4 @@
+import argparse
 import logging
 import sys
 import os
@@ -6,18 +7,56 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from main.util.db_util import DatabaseUtility
-from calculate_cupps_score import update_cupps_scores  # Updated function
+from main.maintenance.model_data import refresh_model_data
+from calculate_cupps_score import update_cupps_scores, check_scoring_parity, SCORING_ENGINES  # Updated function
+from score_report import DEFAULT_REPORT_PATH
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+
+    # Pass in positions via command line, e.g. python update_cupps.py TE WR
+    parser = argparse.ArgumentParser(description="Recalculate CUPPS scores.")
+    parser.add_argument("positions", nargs="*", help="Positions to score (default: all)")
+    parser.add_argument("--engine", choices=sorted(SCORING_ENGINES), default="vectorized",
+                        help="Scoring engine to use (default: vectorized)")
+    parser.add_argument("--since-last-run", action="store_true",
+                        help="Only rescore players whose data changed since the last scoring run")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream season rows from the DB and score players in batches to bound memory")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Players scored per batch when streaming (default: 500)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes to score in, split by player_id (default: 1)")
+    parser.add_argument("--report", default=DEFAULT_REPORT_PATH,
+                        help=f"CSV file for the per-player score breakdown (default: {DEFAULT_REPORT_PATH})")
+    parser.add_argument("--no-report", action="store_true", help="Skip writing the score breakdown CSV")
+    parser.add_argument("--verbose", action="store_true", help="Log every player's score breakdown (DEBUG level)")
+    parser.add_argument("--check-parity", action="store_true",
+                        help="Score with both engines and compare the results without writing to the DB")
+    args = parser.parse_args()
+    positions = args.positions or None
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
     db_util = DatabaseUtility()  # Initialize DB connection
 
-    # Pass in positions via command line, e.g. python run_cupps.py TE WR
-    positions = sys.argv[1:] if len(sys.argv) > 1 else None
+    # The global PFF averages are read from the materialized model data tables, so bring their stats up to date first
+    refresh_model_data(db_util)
+
+    if args.check_parity:
+        logging.info(f"Checking scoring engine parity for positions: {positions or 'ALL'}")
+        parity = check_scoring_parity(db_util, positions)
+        db_util.close_connection()
+        sys.exit(0 if parity else 1)
 
     logging.info(f"Starting CUPPS score update process for positions: {positions or 'ALL'}")
-    update_cupps_scores(db_util, positions)
+    update_cupps_scores(db_util, positions, engine=args.engine, since_last_run=args.since_last_run,
+                        stream=args.stream, batch_size=args.batch_size, workers=args.workers,
+                        report_path=None if args.no_report else args.report)
     logging.info("CUPPS score update process completed.")
 
+    # The tables also copy production/size/cupps scores, which the score write-back just marked dirty
+    refresh_model_data(db_util)
+
     db_util.cursor.close()
     db_util.conn.close()
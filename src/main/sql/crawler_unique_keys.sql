@@ -0,0 +1,18 @@
+-- Unique keys used by the crawler's BatchUpsertPipeline (INSERT ... ON DUPLICATE KEY UPDATE)
+-- Run once. Any existing duplicates have to be removed first, e.g. for player seasons:
+--   SELECT player_id, year, COUNT(*) FROM cfb_player_year_stats GROUP BY player_id, year HAVING COUNT(*) > 1;
+
+-- Players are identified by their sports-reference id (e.g. 'aj-brown-3')
+ALTER TABLE player
+    ADD UNIQUE KEY uq_player_sr_id (sr_id);
+
+-- One college season per player per year
+ALTER TABLE cfb_player_year_stats
+    ADD UNIQUE KEY uq_cfb_player_year (player_id, year);
+
+-- NFL seasons are split by team when a player is traded mid-season
+ALTER TABLE nfl_player_year_stats
+    ADD UNIQUE KEY uq_nfl_player_team_year (player_id, team_id, year);
+
+ALTER TABLE team_year_stats
+    ADD UNIQUE KEY uq_team_year (team_id, year);
@@ -0,0 +1,9 @@
+-- Persistent cache for the global PFF and RAS averages used by the CUPPS scoring run.
+-- Each entry stores the fingerprint of the input tables it was computed from and is
+-- recomputed automatically when the fingerprint changes.
+CREATE TABLE IF NOT EXISTS cupps_averages_cache (
+    cache_key VARCHAR(32) NOT NULL PRIMARY KEY,
+    fingerprint CHAR(64) NOT NULL,
+    payload JSON NOT NULL,
+    computed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
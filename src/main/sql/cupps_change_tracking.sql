@@ -0,0 +1,169 @@
+-- Change tracking for incremental CUPPS rescoring (update_cupps.py --since-last-run)
+-- Triggers record every player whose scoring inputs changed since the last scoring run.
+-- Changes to the global averages are detected separately (see cupps_averages_cache.sql).
+
+-- Players whose CUPPS inputs changed since the last scoring run
+CREATE TABLE IF NOT EXISTS cupps_dirty_player (
+    player_id INT NOT NULL PRIMARY KEY,
+    marked_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+);
+
+-- Single-row bookkeeping for the last scoring run and the global averages it used
+CREATE TABLE IF NOT EXISTS cupps_scoring_state (
+    state_id TINYINT NOT NULL PRIMARY KEY,
+    last_run_at TIMESTAMP(6) NULL,
+    global_averages JSON NULL
+);
+
+INSERT IGNORE INTO cupps_scoring_state (state_id) VALUES (1);
+
+DROP TRIGGER IF EXISTS player_cupps_dirty_insert;
+DROP TRIGGER IF EXISTS player_cupps_dirty_update;
+DROP TRIGGER IF EXISTS player_cupps_dirty_delete;
+DROP TRIGGER IF EXISTS cfb_stats_cupps_dirty_insert;
+DROP TRIGGER IF EXISTS cfb_stats_cupps_dirty_update;
+DROP TRIGGER IF EXISTS cfb_stats_cupps_dirty_delete;
+DROP TRIGGER IF EXISTS nfl_stats_cupps_dirty_insert;
+DROP TRIGGER IF EXISTS nfl_stats_cupps_dirty_update;
+DROP TRIGGER IF EXISTS nfl_stats_cupps_dirty_delete;
+DROP TRIGGER IF EXISTS team_year_cupps_dirty_insert;
+DROP TRIGGER IF EXISTS team_year_cupps_dirty_update;
+
+DELIMITER $$
+
+CREATE TRIGGER player_cupps_dirty_insert AFTER INSERT ON player
+FOR EACH ROW
+BEGIN
+    INSERT INTO cupps_dirty_player (player_id) VALUES (NEW.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+-- Score columns (production_score, size_score, cupps_score) are deliberately ignored
+-- so that writing scores back does not mark the player dirty again
+CREATE TRIGGER player_cupps_dirty_update AFTER UPDATE ON player
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.position <=> NEW.position
+            AND OLD.height <=> NEW.height
+            AND OLD.weight <=> NEW.weight
+            AND OLD.draft_cap <=> NEW.draft_cap
+            AND OLD.draft_year <=> NEW.draft_year
+            AND OLD.ras <=> NEW.ras) THEN
+        INSERT INTO cupps_dirty_player (player_id) VALUES (NEW.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+CREATE TRIGGER player_cupps_dirty_delete AFTER DELETE ON player
+FOR EACH ROW
+BEGIN
+    INSERT INTO cupps_dirty_player (player_id) VALUES (OLD.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+CREATE TRIGGER cfb_stats_cupps_dirty_insert AFTER INSERT ON cfb_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO cupps_dirty_player (player_id) VALUES (NEW.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+CREATE TRIGGER cfb_stats_cupps_dirty_update AFTER UPDATE ON cfb_player_year_stats
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.player_id <=> NEW.player_id
+            AND OLD.team_id <=> NEW.team_id
+            AND OLD.year <=> NEW.year
+            AND OLD.games_played <=> NEW.games_played
+            AND OLD.rec_yds <=> NEW.rec_yds
+            AND OLD.receptions <=> NEW.receptions
+            AND OLD.rush_att <=> NEW.rush_att
+            AND OLD.rush_yds <=> NEW.rush_yds
+            AND OLD.rec_td <=> NEW.rec_td
+            AND OLD.rush_td <=> NEW.rush_td
+            AND OLD.pff_run_grade <=> NEW.pff_run_grade
+            AND OLD.pff_rec_grade <=> NEW.pff_rec_grade
+            AND OLD.yprr <=> NEW.yprr
+            AND OLD.tprr <=> NEW.tprr
+            AND OLD.season_age <=> NEW.season_age
+            AND OLD.team_yards_market_share <=> NEW.team_yards_market_share) THEN
+        INSERT INTO cupps_dirty_player (player_id) VALUES (NEW.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+    -- A season moved to another player changes the old player's score too
+    IF NOT (OLD.player_id <=> NEW.player_id) THEN
+        INSERT INTO cupps_dirty_player (player_id) VALUES (OLD.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+CREATE TRIGGER cfb_stats_cupps_dirty_delete AFTER DELETE ON cfb_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO cupps_dirty_player (player_id) VALUES (OLD.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+-- A player's first NFL season can make them eligible for scoring
+CREATE TRIGGER nfl_stats_cupps_dirty_insert AFTER INSERT ON nfl_player_year_stats
+FOR EACH ROW
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM nfl_player_year_stats
+        WHERE player_id = NEW.player_id
+          AND player_year_id <> NEW.player_year_id
+          AND year <= NEW.year
+    ) THEN
+        INSERT INTO cupps_dirty_player (player_id) VALUES (NEW.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+-- Correcting a season's year or moving it to another player can change both players' first NFL year
+CREATE TRIGGER nfl_stats_cupps_dirty_update AFTER UPDATE ON nfl_player_year_stats
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.player_id <=> NEW.player_id AND OLD.year <=> NEW.year) THEN
+        INSERT INTO cupps_dirty_player (player_id) VALUES (NEW.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+    IF NOT (OLD.player_id <=> NEW.player_id) THEN
+        INSERT INTO cupps_dirty_player (player_id) VALUES (OLD.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+-- Removing a player's first NFL season can make them ineligible for scoring
+CREATE TRIGGER nfl_stats_cupps_dirty_delete AFTER DELETE ON nfl_player_year_stats
+FOR EACH ROW
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM nfl_player_year_stats
+        WHERE player_id = OLD.player_id
+          AND year <= OLD.year
+    ) THEN
+        INSERT INTO cupps_dirty_player (player_id) VALUES (OLD.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+-- Team SOS/SRS feed the SOS multiplier of every player on that team-year
+CREATE TRIGGER team_year_cupps_dirty_insert AFTER INSERT ON team_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO cupps_dirty_player (player_id)
+    SELECT player_id FROM cfb_player_year_stats WHERE team_id = NEW.team_id AND year = NEW.year
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+CREATE TRIGGER team_year_cupps_dirty_update AFTER UPDATE ON team_year_stats
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.team_sos <=> NEW.team_sos AND OLD.team_srs <=> NEW.team_srs) THEN
+        INSERT INTO cupps_dirty_player (player_id)
+        SELECT player_id FROM cfb_player_year_stats WHERE team_id = NEW.team_id AND year = NEW.year
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,139 @@
+-- Materialized copies of rb_model_data, wr_model_data and te_model_data (the views stay the source of truth)
+-- Run once after the three views exist, then fill the tables with:
+--   python3 src/main/maintenance/refresh_model_data.py --full
+-- Afterwards refresh_model_data.py only recomputes players marked in model_data_dirty_player by the triggers below.
+-- If a view definition changes, drop its *_mv table and run this file and a full refresh again.
+
+CREATE TABLE IF NOT EXISTS rb_model_data_mv (PRIMARY KEY (player_id), INDEX idx_rb_model_data_mv_draft_year (draft_year))
+AS SELECT * FROM rb_model_data WHERE FALSE;
+
+CREATE TABLE IF NOT EXISTS wr_model_data_mv (PRIMARY KEY (player_id), INDEX idx_wr_model_data_mv_draft_year (draft_year))
+AS SELECT * FROM wr_model_data WHERE FALSE;
+
+CREATE TABLE IF NOT EXISTS te_model_data_mv (PRIMARY KEY (player_id), INDEX idx_te_model_data_mv_draft_year (draft_year))
+AS SELECT * FROM te_model_data WHERE FALSE;
+
+-- Players whose model data rows are out of date
+CREATE TABLE IF NOT EXISTS model_data_dirty_player (
+    player_id INT NOT NULL PRIMARY KEY,
+    marked_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+);
+
+DROP TRIGGER IF EXISTS player_model_data_dirty_insert;
+DROP TRIGGER IF EXISTS player_model_data_dirty_update;
+DROP TRIGGER IF EXISTS player_model_data_dirty_delete;
+DROP TRIGGER IF EXISTS cfb_stats_model_data_dirty_insert;
+DROP TRIGGER IF EXISTS cfb_stats_model_data_dirty_update;
+DROP TRIGGER IF EXISTS cfb_stats_model_data_dirty_delete;
+DROP TRIGGER IF EXISTS nfl_stats_model_data_dirty_insert;
+DROP TRIGGER IF EXISTS nfl_stats_model_data_dirty_update;
+DROP TRIGGER IF EXISTS nfl_stats_model_data_dirty_delete;
+DROP TRIGGER IF EXISTS team_year_model_data_dirty_insert;
+DROP TRIGGER IF EXISTS team_year_model_data_dirty_update;
+
+DELIMITER $$
+
+CREATE TRIGGER player_model_data_dirty_insert AFTER INSERT ON player
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (NEW.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+-- Only the player columns the views select (scores included) make a row stale
+CREATE TRIGGER player_model_data_dirty_update AFTER UPDATE ON player
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.name <=> NEW.name
+            AND OLD.position <=> NEW.position
+            AND OLD.draft_cap <=> NEW.draft_cap
+            AND OLD.draft_year <=> NEW.draft_year
+            AND OLD.production_score <=> NEW.production_score
+            AND OLD.size_score <=> NEW.size_score
+            AND OLD.cupps_score <=> NEW.cupps_score
+            AND OLD.ras <=> NEW.ras
+            AND OLD.height <=> NEW.height
+            AND OLD.weight <=> NEW.weight) THEN
+        INSERT INTO model_data_dirty_player (player_id) VALUES (NEW.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+CREATE TRIGGER player_model_data_dirty_delete AFTER DELETE ON player
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (OLD.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+CREATE TRIGGER cfb_stats_model_data_dirty_insert AFTER INSERT ON cfb_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (NEW.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+CREATE TRIGGER cfb_stats_model_data_dirty_update AFTER UPDATE ON cfb_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (NEW.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    IF NOT (OLD.player_id <=> NEW.player_id) THEN
+        INSERT INTO model_data_dirty_player (player_id) VALUES (OLD.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+CREATE TRIGGER cfb_stats_model_data_dirty_delete AFTER DELETE ON cfb_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (OLD.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+-- NFL seasons feed avg_fppg_nfl and the 2014+ eligibility filter
+CREATE TRIGGER nfl_stats_model_data_dirty_insert AFTER INSERT ON nfl_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (NEW.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+CREATE TRIGGER nfl_stats_model_data_dirty_update AFTER UPDATE ON nfl_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (NEW.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    IF NOT (OLD.player_id <=> NEW.player_id) THEN
+        INSERT INTO model_data_dirty_player (player_id) VALUES (OLD.player_id)
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+CREATE TRIGGER nfl_stats_model_data_dirty_delete AFTER DELETE ON nfl_player_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id) VALUES (OLD.player_id)
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+-- Team SOS/SRS feed the sos/srs columns of every player on that team-year
+CREATE TRIGGER team_year_model_data_dirty_insert AFTER INSERT ON team_year_stats
+FOR EACH ROW
+BEGIN
+    INSERT INTO model_data_dirty_player (player_id)
+    SELECT player_id FROM cfb_player_year_stats WHERE team_id = NEW.team_id AND year = NEW.year
+    ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+END$$
+
+CREATE TRIGGER team_year_model_data_dirty_update AFTER UPDATE ON team_year_stats
+FOR EACH ROW
+BEGIN
+    IF NOT (OLD.team_sos <=> NEW.team_sos AND OLD.team_srs <=> NEW.team_srs) THEN
+        INSERT INTO model_data_dirty_player (player_id)
+        SELECT player_id FROM cfb_player_year_stats WHERE team_id = NEW.team_id AND year = NEW.year
+        ON DUPLICATE KEY UPDATE marked_at = CURRENT_TIMESTAMP(6);
+    END IF;
+END$$
+
+DELIMITER ;
@@ -0,0 +1,110 @@
+import os
+import sys
+import random
+from decimal import Decimal
+
+# calculate_cupps_score imports its siblings without a package prefix, as update_cupps.py runs it
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../main/scores")))
+
+from calculate_cupps_score import compare_scoring_engines, score_players_vectorized, RAS_BUCKETS, SCORED_POSITIONS
+
+# Same shapes as get_global_pff_averages / get_global_ras_averages return
+GLOBAL_PFF_AVERAGES = {
+    "RB": {"pff_run": 71.5, "pff_rec": 62.25, "yprr": 1.25, "tprr": 0.12},
+    "WR": {"pff_run": 60, "pff_rec": 74.1, "yprr": 2.05, "tprr": 0.21},
+    "TE": {"pff_run": 60, "pff_rec": 68.3, "yprr": 1.55, "tprr": 0.17},
+}
+GLOBAL_RAS_AVERAGES = {
+    position: {bucket: 5.0 + i * 0.75 for i, bucket in enumerate(RAS_BUCKETS)}
+    for position in SCORED_POSITIONS
+}
+
+def player_row(player_id, position, season, height=73, weight=205, draft_cap=45, draft_year=2018, ras=8.12):
+    """ One row of fetch_player_rows: player columns (ras is a FLOAT column) followed by one season's columns. """
+    return (player_id, position, height, weight, None, draft_cap, draft_year, ras) + season
+
+def season(year, games_played=12, scrim_ypg=Decimal("85.4"), fppg=Decimal("16.2"), pff_run=Decimal("74.3"),
+           pff_rec=Decimal("70.1"), yprr=Decimal("1.85"), tprr=Decimal("0.19"), rec_yds=650, rec=42, rush_att=150,
+           rush_yds=900, team_sos=Decimal("4.5"), team_srs=Decimal("10.2"), season_age=20,
+           team_yards_market_share=Decimal("0.24")):
+    return (year, games_played, scrim_ypg, fppg, pff_run, pff_rec, yprr, tprr, rec_yds, rec, rush_att, rush_yds,
+            team_sos, team_srs, season_age, team_yards_market_share)
+
+def build_edge_case_rows():
+    rows = []
+    # Identical players, and a player whose seasons tie on every peak and percentile input
+    for player_id in (1, 2):
+        rows += [player_row(player_id, "RB", season(2016)), player_row(player_id, "RB", season(2017))]
+    rows += [player_row(3, "WR", season(year, rec_yds=1100, rec=60)) for year in (2015, 2016, 2017)]
+
+    # NULL stats: every season column, player size, RAS and draft capital
+    null_season = season(2016, scrim_ypg=None, fppg=None, pff_run=None, pff_rec=None, yprr=None, tprr=None,
+                         rec_yds=None, rec=None, rush_att=None, rush_yds=None, team_sos=None, team_srs=None,
+                         season_age=None, team_yards_market_share=None)
+    rows.append(player_row(4, "TE", null_season, height=None, weight=None, draft_cap=None, ras=None))
+    rows.append(player_row(5, "WR", null_season, ras=None))
+    rows.append(player_row(5, "WR", season(2017, pff_rec=None, yprr=None, tprr=None, season_age=None)))
+    for draft_cap in (5, 20, 80, 250):
+        rows.append(player_row(10 + draft_cap, "TE", season(2017, rec=30, rush_att=0, pff_run=None), draft_cap=draft_cap, ras=None))
+
+    # Seasons that are skipped (no games) or below the touch thresholds
+    rows.append(player_row(6, "RB", season(2015, games_played=None)))
+    rows.append(player_row(6, "RB", season(2016, games_played=0)))
+    rows.append(player_row(7, "RB", season(2016, rush_att=20, rec=10)))
+    rows.append(player_row(8, "WR", season(2016, rec=4, rush_att=3)))
+    rows.append(player_row(8, "WR", season(2017, rec=11, rush_att=21, season_age=25)))
+
+    # Big seasons past the yardage boosts
+    rows.append(player_row(9, "RB", season(2017, rush_yds=700, season_age=18)))
+    rows.append(player_row(9, "RB", season(2018, rush_yds=1500, rec_yds=400, season_age=19)))
+    rows.append(player_row(100, "WR", season(2018, rec_yds=1450, rec=90, season_age=20), draft_cap=8))
+    return rows
+
+def build_random_rows(num_players=300, seed=7):
+    """ Random player-seasons on coarse grids, so ties and NULLs are common. """
+    rng = random.Random(seed)
+
+    def maybe(value):
+        return None if rng.random() < 0.15 else value
+
+    rows = []
+    for player_id in range(1000, 1000 + num_players):
+        position = rng.choice(SCORED_POSITIONS)
+        draft_cap = maybe(rng.choice([3, 10, 16, 32, 33, 64, 100, 101, 150, 220, 280]))
+        ras = maybe(rng.choice([2.5, 5.0, 7.75, 9.9]))
+        height, weight = maybe(rng.choice([66, 70, 74, 77])), maybe(rng.choice([180, 195, 215, 250]))
+        # Ordered by player_id and year, as fetch_player_rows returns them
+        for year in sorted(rng.sample(range(2012, 2019), rng.randint(1, 4))):
+            rows.append(player_row(player_id, position, season(
+                year,
+                games_played=maybe(rng.choice([0, 6, 12, 13])),
+                scrim_ypg=maybe(Decimal(rng.choice(["0", "45.5", "90.0", "120.25"]))),
+                fppg=maybe(Decimal(rng.choice(["0", "8.5", "15.0", "22.75"]))),
+                pff_run=maybe(Decimal(rng.choice(["0", "65.0", "78.4", "90.1"]))),
+                pff_rec=maybe(Decimal(rng.choice(["0", "60.0", "72.5", "88.8"]))),
+                yprr=maybe(Decimal(rng.choice(["0", "1.2", "2.0", "3.1"]))),
+                tprr=maybe(Decimal(rng.choice(["0", "0.15", "0.22", "0.3"]))),
+                rec_yds=maybe(rng.choice([0, 300, 800, 1100, 1400])),
+                rec=maybe(rng.choice([0, 5, 10, 11, 40, 80])),
+                rush_att=maybe(rng.choice([0, 20, 21, 150, 250])),
+                rush_yds=maybe(rng.choice([0, 500, 1100, 1600])),
+                team_sos=maybe(Decimal(rng.choice(["-5.5", "0", "3.2", "9.8"]))),
+                team_srs=maybe(Decimal(rng.choice(["-12.0", "0", "7.5", "20.1"]))),
+                season_age=maybe(rng.choice([18, 19, 20, 21, 22, 23, 24, 25, 26])),
+                team_yards_market_share=maybe(Decimal(rng.choice(["0", "0.12", "0.25", "0.4"]))),
+            ), height=height, weight=weight, draft_cap=draft_cap, ras=ras))
+    return rows
+
+def test_edge_cases_score_identically():
+    rows = build_edge_case_rows()
+    assert compare_scoring_engines(rows, GLOBAL_PFF_AVERAGES, GLOBAL_RAS_AVERAGES) == []
+
+def test_random_rows_score_identically():
+    rows = build_random_rows(num_players=2000)
+    assert compare_scoring_engines(rows, GLOBAL_PFF_AVERAGES, GLOBAL_RAS_AVERAGES) == []
+
+def test_unscored_positions_are_skipped():
+    rows = build_edge_case_rows() + [player_row(500, "QB", season(2017))]
+    scored_player_ids = {score[0] for score in score_players_vectorized(rows, GLOBAL_PFF_AVERAGES, GLOBAL_RAS_AVERAGES)}
+    assert 500 not in scored_player_ids
+    assert compare_scoring_engines(rows, GLOBAL_PFF_AVERAGES, GLOBAL_RAS_AVERAGES) == []